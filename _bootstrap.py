@@ -0,0 +1,9 @@
+# path _bootstrap.py
+"""
+Process-wide environment setup. Import this before anything that may pull in TensorFlow,
+so its settings are in place before TensorFlow initializes.
+"""
+import os
+
+# Suppress TensorFlow C++ log messages; run with TF_CPP_MIN_LOG_LEVEL=0 set to see them when debugging
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
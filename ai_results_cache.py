@@ -0,0 +1,107 @@
+#!filepath: ai_results_cache.py
+import logging
+import os
+import pathlib
+import pickle
+from typing import Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# On-disk cache file, kept in the user's home so it is shared between checkouts
+DEFAULT_CACHE_PATH = pathlib.Path.home() / '.ai-music-tagger' / 'cache.pkl'
+
+# Stored per file path: (st_mtime_ns, st_size, settings_key, genres_dict)
+_Entry = Tuple[int, int, Hashable, Dict[str, float]]
+
+
+class AIResultsCache:
+    """
+    Persistent cache of AI genre suggestions, so unchanged files are not re-analyzed on repeat runs.
+    An entry is valid only while the file's mtime and size are unchanged and the AI settings
+    that produced it (see settings_key()) are the same.
+    """
+
+    def __init__(self, cache_path: pathlib.Path = DEFAULT_CACHE_PATH):
+        self.cache_path = cache_path
+        self._entries: Optional[Dict[str, _Entry]] = None
+        self._dirty = False
+
+    @staticmethod
+    def settings_key(musicnn_settings: 'musicnn_tagger.config.MusicnnSettings') -> Hashable:
+        """Returns a fingerprint of the Musicnn settings that affect the AI results."""
+        enabled_models = tuple(sorted(name for name, is_enabled in musicnn_settings.enabled_models.items() if is_enabled))
+        return (musicnn_settings.genres_count, musicnn_settings.threshold_weight, enabled_models)
+
+    def _load(self) -> Dict[str, _Entry]:
+        """Loads the cache file on first use. A missing or corrupt file yields an empty cache."""
+        if self._entries is None:
+            try:
+                # One read of the whole file, then unpickle from memory
+                self._entries = pickle.loads(self.cache_path.read_bytes())
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+                logger.warning(f"Could not read AI results cache {self.cache_path}: {e}")
+                self._entries = {}
+        return self._entries
+
+    def get(self, file_path: str, settings_key: Hashable,
+            stat_result: Optional[os.stat_result] = None) -> Optional[Dict[str, float]]:
+        """
+        Returns the cached AI genres for a file, or None if missing or stale.
+        stat_result is the file's current stat, if the caller already has it.
+        """
+        entry = self._load().get(file_path)
+        if entry is None:
+            return None
+        if stat_result is None:
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                return None
+        mtime_ns, size, entry_settings_key, genres = entry
+        if (mtime_ns, size, entry_settings_key) != (stat_result.st_mtime_ns, stat_result.st_size, settings_key):
+            return None
+        return genres
+
+    def put(self, file_path: str, settings_key: Hashable, genres: Dict[str, float]) -> None:
+        """Stores the AI genres for a file along with its current mtime and size."""
+        if not genres:
+            return  # Empty results are usually worker errors; analyze again next time
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return
+        self._load()[file_path] = (stat_result.st_mtime_ns, stat_result.st_size, settings_key, genres)
+        self._dirty = True
+
+    def refresh(self, file_path: str) -> None:
+        """
+        Updates the stored mtime and size of a cached file after its tags were rewritten,
+        since writing a genre tag changes both without changing the audio.
+        """
+        entry = self._load().get(file_path)
+        if entry is None:
+            return
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return
+        if (entry[0], entry[1]) != (stat_result.st_mtime_ns, stat_result.st_size):
+            self._entries[file_path] = (stat_result.st_mtime_ns, stat_result.st_size, entry[2], entry[3])
+            self._dirty = True
+
+    def save(self) -> None:
+        """Writes the cache to disk if it changed since it was loaded."""
+        if not self._dirty or self._entries is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write next to the cache and rename over it, so a crash mid-write can't leave a truncated pickle
+            tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+            tmp_path.write_bytes(pickle.dumps(self._entries, protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(str(tmp_path), str(self.cache_path))
+            self._dirty = False
+            logger.debug(f"AI results cache saved to {self.cache_path}")
+        except OSError as e:
+            logger.warning(f"Could not write AI results cache {self.cache_path}: {e}")
@@ -0,0 +1,59 @@
+# path env_file.py
+import logging
+import os
+import pathlib
+import re
+import tempfile
+from typing import Dict, Union
+
+logger = logging.getLogger(__name__)
+
+# Matches "KEY=..." and "export KEY=..." assignment lines in a .env file
+_KEY_LINE_RE = re.compile(r'^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_.]*)\s*=')
+
+
+def _quote(value: str) -> str:
+    """Quotes a value the same way dotenv.set_key does by default (single quotes)."""
+    return "'{}'".format(value.replace("'", "\\'"))
+
+
+def save_env_values(dotenv_path: Union[str, pathlib.Path], values: Dict[str, str]) -> None:
+    """
+    Writes several keys to a .env file in a single read + rewrite, instead of one
+    dotenv.set_key call (a full parse and rewrite of the file) per key.
+    Existing keys are updated in place, new keys are appended, other lines are kept as-is.
+    The new content is written to a temporary file and moved over the original atomically.
+
+    Args:
+        dotenv_path: Path to the .env file (created if it does not exist).
+        values: Mapping of environment variable names to their new (unquoted) values.
+    """
+    dotenv_path = pathlib.Path(dotenv_path)
+    try:
+        old_content = dotenv_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        old_content = None
+    lines = old_content.splitlines() if old_content else []
+
+    pending = dict(values)
+    for index, line in enumerate(lines):
+        match = _KEY_LINE_RE.match(line)
+        if match and match.group(1) in pending:
+            key = match.group(1)
+            lines[index] = f"{key}={_quote(pending.pop(key))}"
+    lines.extend(f"{key}={_quote(value)}" for key, value in pending.items())
+
+    new_content = '\n'.join(lines) + '\n'
+    if new_content == old_content:  # e.g. a setting toggled and toggled back before the save ran
+        logger.debug(f"{dotenv_path} already up to date")
+        return
+
+    fd, tmp_path = tempfile.mkstemp(dir=str(dotenv_path.parent), prefix='.env.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+            tmp_file.write(new_content)
+        os.replace(tmp_path, str(dotenv_path))
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    logger.debug(f"Saved {len(values)} key(s) to {dotenv_path}")
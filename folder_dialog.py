@@ -0,0 +1,96 @@
+# path folder_dialog.py
+"""
+Native Windows folder picker (SHBrowseForFolderW) called through ctypes, so selecting a
+folder does not have to load and initialize Tcl/Tk.
+"""
+import ctypes
+import sys
+from typing import Optional
+
+if sys.platform == 'win32':
+    from ctypes import wintypes
+
+    _BIF_RETURNONLYFSDIRS = 0x0001
+    _BIF_NEWDIALOGSTYLE = 0x0040  # Resizable dialog with a "Make New Folder" button
+    _BFFM_INITIALIZED = 1
+    _BFFM_SETSELECTIONW = 0x0467
+    _MAX_PATH = 260
+
+    _BrowseCallbackProc = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HWND, wintypes.UINT, wintypes.LPARAM, wintypes.LPARAM)
+
+    class _BROWSEINFOW(ctypes.Structure):
+        _fields_ = [
+            ('hwndOwner', wintypes.HWND),
+            ('pidlRoot', ctypes.c_void_p),
+            ('pszDisplayName', wintypes.LPWSTR),
+            ('lpszTitle', wintypes.LPCWSTR),
+            ('ulFlags', wintypes.UINT),
+            ('lpfn', _BrowseCallbackProc),
+            ('lParam', wintypes.LPARAM),
+            ('iImage', ctypes.c_int),
+        ]
+
+    _shell32 = ctypes.windll.shell32
+    _ole32 = ctypes.windll.ole32
+    _user32 = ctypes.windll.user32
+    _shell32.SHBrowseForFolderW.argtypes = [ctypes.POINTER(_BROWSEINFOW)]
+    _shell32.SHBrowseForFolderW.restype = ctypes.c_void_p
+    _shell32.SHGetPathFromIDListW.argtypes = [ctypes.c_void_p, wintypes.LPWSTR]
+    _shell32.SHGetPathFromIDListW.restype = wintypes.BOOL
+    _ole32.CoTaskMemFree.argtypes = [ctypes.c_void_p]
+    _ole32.CoTaskMemFree.restype = None
+    _user32.SendMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+    _user32.SendMessageW.restype = wintypes.LPARAM
+
+
+def browse_for_folder(title: str, initial_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Shows the native Windows "Browse For Folder" dialog.
+
+    Args:
+        title: Text shown above the folder tree.
+        initial_dir: Folder selected when the dialog opens.
+
+    Returns:
+        Optional[str]: The selected folder, or None if the user cancelled.
+
+    Raises:
+        OSError: If not running on Windows or the dialog could not be shown.
+    """
+    if sys.platform != 'win32':
+        raise OSError("The native folder dialog is only available on Windows")
+
+    initial_dir_buffer = ctypes.create_unicode_buffer(initial_dir) if initial_dir else None
+
+    @_BrowseCallbackProc
+    def on_browse_event(hwnd, message, lparam, data):
+        if message == _BFFM_INITIALIZED and initial_dir_buffer is not None:
+            _user32.SendMessageW(hwnd, _BFFM_SETSELECTIONW, True, ctypes.addressof(initial_dir_buffer))
+        return 0
+
+    display_name = ctypes.create_unicode_buffer(_MAX_PATH)
+    browse_info = _BROWSEINFOW(
+        hwndOwner=None,
+        pidlRoot=None,
+        pszDisplayName=ctypes.cast(display_name, wintypes.LPWSTR),
+        lpszTitle=title,
+        ulFlags=_BIF_RETURNONLYFSDIRS | _BIF_NEWDIALOGSTYLE,
+        lpfn=on_browse_event,
+        lParam=0,
+        iImage=0,
+    )
+
+    _ole32.CoInitialize(None)  # The new dialog style requires COM on this thread
+    try:
+        pidl = _shell32.SHBrowseForFolderW(ctypes.byref(browse_info))
+        if not pidl:  # Cancelled
+            return None
+        try:
+            path = ctypes.create_unicode_buffer(_MAX_PATH)
+            if not _shell32.SHGetPathFromIDListW(pidl, path):
+                raise OSError("Selected item is not a file system folder")
+            return path.value
+        finally:
+            _ole32.CoTaskMemFree(pidl)
+    finally:
+        _ole32.CoUninitialize()
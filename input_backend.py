@@ -0,0 +1,127 @@
+# path input_backend.py
+"""
+Minimal keyboard input for the interactive menu, built on the standard library
+(msvcrt on Windows, termios on POSIX) instead of a system-wide keyboard hook.
+"""
+import contextlib
+import os
+import sys
+
+# Key names returned by read_key(); arrows may be prefixed with 'shift+'
+UP, DOWN, LEFT, RIGHT = 'up', 'down', 'left', 'right'
+ENTER, ESC, BACKSPACE = 'enter', 'esc', 'backspace'
+
+if os.name == 'nt':
+    import ctypes
+    import msvcrt
+
+    _VK_SHIFT = 0x10
+    _WINDOWS_ARROWS = {'H': UP, 'P': DOWN, 'K': LEFT, 'M': RIGHT}
+    _WINDOWS_KEYS = {'\r': ENTER, '\x1b': ESC, '\x08': BACKSPACE}
+
+    def _shift_pressed() -> bool:
+        """Returns True if a Shift key is currently held down."""
+        return bool(ctypes.windll.user32.GetKeyState(_VK_SHIFT) & 0x8000)
+
+    def read_key() -> str:
+        """
+        Blocks until a key is pressed and returns its name.
+
+        Returns:
+            str: One of the key name constants ('shift+' prefixed for Shift+arrow),
+                 or the typed character for any other key.
+        """
+        char = msvcrt.getwch()
+        if char in ('\x00', '\xe0'):  # Prefix of an extended (arrow/function) key
+            name = _WINDOWS_ARROWS.get(msvcrt.getwch(), '')
+            return f"shift+{name}" if name and _shift_pressed() else name
+        return _WINDOWS_KEYS.get(char, char)
+
+    def key_mode():
+        """Console input needs no mode switch on Windows; see the POSIX version."""
+        return contextlib.nullcontext()
+
+    def line_mode():
+        """Console input needs no mode switch on Windows; see the POSIX version."""
+        return contextlib.nullcontext()
+
+else:
+    import select
+    import termios
+    import tty
+
+    _ANSI_ARROWS = {'A': UP, 'B': DOWN, 'C': RIGHT, 'D': LEFT}
+    _POSIX_KEYS = {'\r': ENTER, '\n': ENTER, '\x7f': BACKSPACE, '\x08': BACKSPACE}
+    _ESCAPE_TIMEOUT = 0.05  # Seconds to wait for the rest of an escape sequence
+    # Terminal attributes saved by key_mode(); None outside of it
+    _saved_attributes = None
+
+    def _read_escape_sequence(fd: int) -> str:
+        """Reads the bytes following ESC that are already available (an escape sequence)."""
+        sequence = ''
+        while select.select([fd], [], [], _ESCAPE_TIMEOUT)[0]:
+            sequence += os.read(fd, 1).decode(errors='ignore')
+            if sequence[-1].isalpha() or sequence[-1] == '~':  # Final byte of the sequence
+                break
+        return sequence
+
+    @contextlib.contextmanager
+    def key_mode():
+        """
+        Keeps the terminal in cbreak mode for a whole series of read_key() calls, so keys typed
+        between reads (e.g. a held arrow key) are neither echoed nor line-buffered.
+        """
+        global _saved_attributes
+        if _saved_attributes is not None:  # Already inside key_mode()
+            yield
+            return
+        fd = sys.stdin.fileno()
+        _saved_attributes = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            yield
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, _saved_attributes)
+            _saved_attributes = None
+
+    @contextlib.contextmanager
+    def line_mode():
+        """Temporarily restores normal line input inside key_mode(), for input() prompts."""
+        if _saved_attributes is None:
+            yield
+            return
+        fd = sys.stdin.fileno()
+        key_attributes = termios.tcgetattr(fd)
+        termios.tcsetattr(fd, termios.TCSADRAIN, _saved_attributes)
+        try:
+            yield
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, key_attributes)
+
+    def _decode_key(fd: int) -> str:
+        """Reads one key press from a terminal in cbreak mode and returns its name."""
+        char = os.read(fd, 1).decode(errors='ignore')
+        if char != '\x1b':
+            return _POSIX_KEYS.get(char, char)
+        sequence = _read_escape_sequence(fd)
+        if not sequence:  # A lone ESC press
+            return ESC
+        name = _ANSI_ARROWS.get(sequence[-1], '') if sequence[0] in '[O' else ''
+        # Modified arrows look like ESC[1;2C, where modifier 2 is Shift
+        return f"shift+{name}" if name and ';2' in sequence else name
+
+    def read_key() -> str:
+        """
+        Blocks until a key is pressed and returns its name.
+        Outside of key_mode() the terminal is switched to cbreak mode only for the duration
+        of the read, so regular input() calls elsewhere keep working.
+
+        Returns:
+            str: One of the key name constants ('shift+' prefixed for Shift+arrow),
+                 or the typed character for any other key.
+        """
+        fd = sys.stdin.fileno()
+        if _saved_attributes is not None:
+            return _decode_key(fd)
+        with key_mode():
+            return _decode_key(fd)
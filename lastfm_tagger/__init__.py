@@ -1,2 +1,2 @@
 #!filepath: lastfm_tagger/__init__.py
-from .lastfm_tagger import get_lastfm_tags
\ No newline at end of file
+from .lastfm_tagger import get_lastfm_tags, get_lastfm_tags_many
\ No newline at end of file
@@ -1,13 +1,39 @@
 #!filepath: lastfm_tagger/api_client.py
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
-from typing import Dict, Any
-import urllib.parse
+import sys
+import unicodedata
+from typing import Dict, Tuple
 
 from lastfm_tagger.config import LastFMSettings
+from lastfm_tagger.response_cache import get_response_cache
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeouts in seconds for Last.fm API requests
+REQUEST_TIMEOUT = (3.05, 10)
+
+# In-process cache of raw API responses keyed on (method, artist, track)
+_TAG_CACHE: Dict[Tuple[str, str, str], Dict] = {}
+
+
+def _normalize_key(name: str) -> str:
+    """
+    Normalizes an artist/track name for use in cache keys: collapses whitespace,
+    applies NFC unicode normalization and casefolds. The result is interned so
+    repeated names share one string object. The original name is still sent to the API.
+    """
+    return sys.intern(unicodedata.normalize('NFC', ' '.join(name.split())).casefold())
+
+
+def clear_tag_cache() -> None:
+    """Clears the in-process cache of Last.fm tag responses."""
+    _TAG_CACHE.clear()
+
+
 class LastFMClient:
     """
     Client for interacting with the Last.fm API.
@@ -21,23 +47,44 @@ class LastFMClient:
             settings: An instance of Settings containing API configurations.
         """
         self.settings = settings
-
-    def _build_api_url(self, method: str, params: Dict[str, Any]) -> str:
-        """
-        Constructs the full API URL for a given method and parameters.
-        Function name unified to _build_api_url for consistency.
-        """
-        base_url = self.settings.lastfm_api_base_url
-        api_key = self.settings.lastfm_api_key
-        full_params = {
-            'method': method,
-            'api_key': api_key,
+        # Query parameters shared by every request, built once per client
+        self._base_params: Dict[str, str] = {
+            'api_key': settings.lastfm_api_key,
             'format': 'json',
             'autocorrect': '1',
-            **{k: urllib.parse.quote(v) if isinstance(v, str) else v for k, v in params.items()} # URL encode params
         }
-        param_string = '&'.join([f"{key}={value}" for key, value in full_params.items()])
-        return f"{base_url}?{param_string}"
+        # Persistent session keeps the connection to Last.fm alive between lookups
+        self._session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16, max_retries=retries)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        # Ask for compressed JSON explicitly; requests decompresses it transparently
+        self._session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Accept': 'application/json',
+            'User-Agent': 'lastfm-tagger/1.0',
+        })
+        # On-disk ETag cache for conditional requests across runs, shared with other clients
+        self._response_cache = get_response_cache()
+
+    def close(self) -> None:
+        """Closes the underlying HTTP session and releases pooled connections."""
+        self._session.close()
+        self._response_cache.save()
+
+    def __enter__(self) -> 'LastFMClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _build_api_params(self, method: str, params: Dict[str, str]) -> Dict[str, str]:
+        """
+        Constructs the full query parameters for a given API method.
+        URL encoding is left to requests, so values are passed through unchanged.
+        """
+        return {**self._base_params, 'method': method, **params}
 
     def get_track_top_tags(self, artist_name: str, track_name: str) -> Dict:
         """
@@ -45,13 +92,16 @@ class LastFMClient:
         Function name unified to get_track_top_tags for consistency.
         """
         api_method = 'track.getTopTags'
+        cache_key = (api_method, _normalize_key(artist_name), _normalize_key(track_name))
+        if cache_key in _TAG_CACHE:
+            logger.debug("Using cached track top tags for: %s - %s", artist_name, track_name)
+            return _TAG_CACHE[cache_key]
         params = {
             'artist': artist_name,
             'track': track_name
         }
-        url = self._build_api_url(api_method, params)
-        logger.info(f"Fetching track top tags from: {url}")
-        return self._fetch_api_data(url)
+        logger.info("Fetching track top tags for: %s - %s", artist_name, track_name)
+        return self._cache_response(cache_key, self._fetch_api_data(self._build_api_params(api_method, params), cache_key))
 
 
     def get_artist_top_tags(self, artist_name: str) -> Dict:
@@ -60,36 +110,57 @@ class LastFMClient:
         Function name un ified to get_artist_top_tags for consistency.
         """
         api_method = 'artist.getTopTags'
+        cache_key = (api_method, _normalize_key(artist_name), '')
+        if cache_key in _TAG_CACHE:
+            logger.debug("Using cached artist top tags for: %s", artist_name)
+            return _TAG_CACHE[cache_key]
         params = {
             'artist': artist_name,
         }
-        url = self._build_api_url(api_method, params)
-        logger.info(f"Fetching artist top tags from: {url}")
-        return self._fetch_api_data(url)
+        logger.info("Fetching artist top tags for: %s", artist_name)
+        return self._cache_response(cache_key, self._fetch_api_data(self._build_api_params(api_method, params), cache_key))
+
+    @staticmethod
+    def _cache_response(cache_key: Tuple[str, str, str], json_response: Dict) -> Dict:
+        """
+        Stores a successful API response in the tag cache and returns it.
+        Empty (failed) responses are not cached so the lookup is retried next time.
+        """
+        if json_response:
+            _TAG_CACHE[cache_key] = json_response
+        return json_response
 
-    def _fetch_api_data(self, url: str) -> Dict:
+    def _fetch_api_data(self, params: Dict[str, str], tag_cache_key: Tuple[str, str, str]) -> Dict:
         """
-        Fetches data from the Last.fm API at the given URL and handles errors.
+        Fetches data from the Last.fm API with the given query parameters and handles errors.
         Function name unified to _fetch_api_data for consistency.
         """
         try:
-            response = requests.get(url)
+            cache_key = self._response_cache.key_for(tag_cache_key)
+            response = self._session.get(self.settings.lastfm_api_base_url, params=params, timeout=REQUEST_TIMEOUT,
+                                         headers=self._response_cache.conditional_headers(cache_key))
+            if response.status_code == 304:  # Not modified, reuse the cached body without parsing
+                logger.debug("Last.fm response not modified, using cached body for: %s", cache_key)
+                return self._response_cache.get_body(cache_key)
             response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-            json_response = response.json()
-            logger.debug(f"API Response JSON: {json_response}")
+            json_response = orjson.loads(response.content)
+            if 'error' not in json_response:
+                self._response_cache.store(cache_key, response.headers.get('ETag'),
+                                           response.headers.get('Last-Modified'), json_response)
+            logger.debug("API Response JSON: %s", json_response)
             return json_response
         except requests.exceptions.HTTPError as http_err:
-            logger.error(f"HTTP error occurred: {http_err}")
+            logger.error("HTTP error occurred: %s", http_err)
             return {}
         except requests.exceptions.ConnectionError as conn_err:
-            logger.error(f"Connection error occurred: {conn_err}")
+            logger.error("Connection error occurred: %s", conn_err)
             return {}
         except requests.exceptions.Timeout as timeout_err:
-            logger.error(f"Timeout error occurred: {timeout_err}")
+            logger.error("Timeout error occurred: %s", timeout_err)
             return {}
         except requests.exceptions.RequestException as req_err:
-            logger.error(f"Unexpected error occurred: {req_err}")
+            logger.error("Unexpected error occurred: %s", req_err)
             return {}
-        except ValueError as json_err:
-            logger.error(f"JSON decoding error: {json_err}")
+        except (orjson.JSONDecodeError, ValueError) as json_err:
+            logger.error("JSON decoding error: %s", json_err)
             return {}
\ No newline at end of file
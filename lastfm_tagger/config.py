@@ -1,15 +1,23 @@
 #!filepath: lastfm_tagger/config.py
+import functools
 import os
 import pathlib
-from dotenv import load_dotenv, set_key
+from dotenv import load_dotenv
 import logging
 
+from env_file import save_env_values
+
+# Load environment variables from .env file in the parent directory once, at import time
+_DOTENV_PATH = pathlib.Path(__file__).parent.parent / '.env'
+load_dotenv(dotenv_path=_DOTENV_PATH, encoding='utf-8', verbose=False)
+
 
 class LastFMSettings:
     """
     Settings class for managing application configurations for lastfm_tagger using dotenv.
     It loads settings from and saves settings to environment variables in .env.
     """
+    __slots__ = ('dotenv_path', 'lastfm_api_key', 'enabled', 'threshold_weight', 'lastfm_api_base_url')
 
     lastfm_api_key: str
     enabled: bool
@@ -17,9 +25,7 @@ class LastFMSettings:
     lastfm_api_base_url: str
 
     def __init__(self):
-        # Load environment variables from .env file in the parent directory
-        self.dotenv_path = pathlib.Path(__file__).parent.parent / '.env'
-        load_dotenv(dotenv_path=self.dotenv_path, encoding='utf-8', verbose=False) # Load .env
+        self.dotenv_path = _DOTENV_PATH  # .env is already loaded at import time
 
         # Initialize settings from environment variables or defaults
         self.lastfm_api_key = os.environ.get("LASTFM_API_KEY")
@@ -31,6 +37,14 @@ class LastFMSettings:
 
     def save_settings(self):
         """Save current settings to .env file."""
-        set_key(self.dotenv_path, "LASTFM_ENABLED", str(self.enabled).upper())
-        set_key(self.dotenv_path, "LASTFM_THRESHOLD_WEIGHT", str(self.threshold_weight))
+        save_env_values(self.dotenv_path, {
+            "LASTFM_ENABLED": str(self.enabled).upper(),
+            "LASTFM_THRESHOLD_WEIGHT": str(self.threshold_weight),
+        })
         logging.debug("LastFMSettings saved to .env")
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> LastFMSettings:
+    """Returns a process-wide LastFMSettings instance, built on first use."""
+    return LastFMSettings()
@@ -1,9 +1,13 @@
 #!filepath: lastfm_tagger/lastfm_tagger.py
+import atexit
+import heapq
 import logging
 import os
-from typing import List, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
 
-from .config import LastFMSettings
+from .config import get_settings
 from .api_client import LastFMClient
 from .parser import parse_track_tags, parse_artist_tags
 from .models import TagModel
@@ -11,13 +15,50 @@ from .models import TagModel
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def _remove_duplicate_tags(tags_weights: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+_client: Optional[LastFMClient] = None
+_client_lock = threading.Lock()
+
+# Shared pool for speculative artist-tag requests of single lookups (see get_lastfm_tags)
+_artist_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='lastfm-artist')
+
+
+def _get_client() -> LastFMClient:
+    """Returns the shared LastFMClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LastFMClient(get_settings())
+                atexit.register(_client.close)  # Release pooled connections on interpreter exit
+    return _client
+
+
+def _iter_by_weight(tags_weights: List[Tuple[str, int]]) -> Iterator[Tuple[str, int]]:
+    """
+    Lazily yields tags in descending weight order using a heap, so callers that only
+    need the first few tags do not pay for a full sort. Ties keep their original order.
+
+    Args:
+        tags_weights: A list of tuples, where each tuple is (tag name, tag weight).
+
+    Yields:
+        (tag name, tag weight) tuples, heaviest first.
+    """
+    heap = [(-tag_weight, index, tag_name) for index, (tag_name, tag_weight) in enumerate(tags_weights)]
+    heapq.heapify(heap)
+    while heap:
+        negative_weight, _, tag_name = heapq.heappop(heap)
+        yield tag_name, -negative_weight
+
+
+def _remove_duplicate_tags(tags_weights: Iterable[Tuple[str, int]], limit: Optional[int] = None) -> List[Tuple[str, int]]:
     """
     Removes duplicate or very similar tags from a list of tags and weights.
     Keeps only the first occurrence of similar tags, prioritizing shorter tags.
 
     Args:
-        tags_weights: A list of tuples, where each tuple is (tag name, tag weight).
+        tags_weights: An iterable of tuples, where each tuple is (tag name, tag weight).
+        limit: Stop once this many unique tags have been collected (None for no limit).
 
     Returns:
         A list of tuples with duplicate tags removed.
@@ -26,6 +67,8 @@ def _remove_duplicate_tags(tags_weights: List[Tuple[str, int]]) -> List[Tuple[st
     seen_tags: List[str] = []
 
     for tag_name, tag_weight in tags_weights:
+        if limit is not None and len(unique_tags_weights) >= limit:
+            break
         is_duplicate = False
         tag_lower = tag_name.lower()
         for seen_tag in seen_tags:
@@ -38,7 +81,8 @@ def _remove_duplicate_tags(tags_weights: List[Tuple[str, int]]) -> List[Tuple[st
     return unique_tags_weights
 
 
-def get_lastfm_tags(artist_name: str, track_name: str, top_n: int = 5, min_weight: float = 60) -> List[Tuple[str, int]]:
+def get_lastfm_tags(artist_name: str, track_name: str, top_n: int = 5, min_weight: float = 60,
+                    speculative_artist: bool = False) -> List[Tuple[str, int]]:
     """
     Retrieves top tags and their weights for a given music track from Last.fm.
     If track tags are not found, falls back to artist tags.
@@ -50,41 +94,80 @@ def get_lastfm_tags(artist_name: str, track_name: str, top_n: int = 5, min_weigh
         track_name: The name of the track.
         top_n: Maximum number of top tags to return.
         min_weight: Minimum weight threshold for tags (as a fraction, e.g., 60 for 60%).
+        speculative_artist: Request the artist tags alongside the track tags, so the fallback costs
+            no extra round-trip. This doubles the requests sent, so it is meant for single interactive
+            lookups only; batch callers already overlap their round-trips across tracks.
 
     Returns:
         A list of tuples, where each tuple contains (tag name: str, tag weight: int),
         filtered and sorted. Returns an empty list if no tags are found.
     """
 
-    settings = LastFMSettings()
-    last_fm_client = LastFMClient(settings)
+    last_fm_client = _get_client()
 
-    track_api_response = last_fm_client.get_track_top_tags(artist_name, track_name)
-    track_tags: List[TagModel] = parse_track_tags(track_api_response)
+    artist_future: Optional[Future] = None
+    if speculative_artist:
+        artist_future = _artist_executor.submit(last_fm_client.get_artist_top_tags, artist_name)
+    track_tags: List[TagModel] = parse_track_tags(last_fm_client.get_track_top_tags(artist_name, track_name))
 
     if not track_tags:
-        logger.info(f"No track tags found for '{track_name}' by '{artist_name}'. Falling back to artist tags.")
-        artist_tags: List[TagModel] = parse_artist_tags(last_fm_client.get_artist_top_tags(artist_name))
+        logger.info("No track tags found for '%s' by '%s'. Falling back to artist tags.", track_name, artist_name)
+        # The speculative request is only waited for here; on a track hit it finishes in the background
+        # and its response is simply not used
+        artist_response = artist_future.result() if artist_future is not None else last_fm_client.get_artist_top_tags(artist_name)
+        artist_tags: List[TagModel] = parse_artist_tags(artist_response)
         if artist_tags:
-            logger.info(f"Artist tags found for '{artist_name}'.")
+            logger.info("Artist tags found for '%s'.", artist_name)
             track_tags = artist_tags  # Use artist tags as fallback
         else:
-            logger.info(f"No tags found for '{track_name}' by '{artist_name}', and no artist tags found either.")
+            logger.info("No tags found for '%s' by '%s', and no artist tags found either.", track_name, artist_name)
             return []
 
-    # Filtering and sorting logic
-    all_tags_weights = [(tag.name, tag.count) for tag in track_tags if tag.count is not None]
-    total_weight = sum(weight for _, weight in all_tags_weights)
-    if total_weight > 0:
-        filtered_tags = [(tag, weight) for tag, weight in all_tags_weights if weight >= min_weight]
+    if min_weight <= 0:
+        # Every weighted tag passes the filter, no need to sum or compare weights
+        filtered_tags = [(tag.name, tag.count) for tag in track_tags if tag.count is not None]
     else:
-        filtered_tags = all_tags_weights # Keep all if total weight is zero to avoid division by zero errors
-    sorted_tags_weights = sorted(filtered_tags, key=lambda item: item[1], reverse=True)
+        # Filtering logic: sum the weights and filter by min_weight in a single pass
+        total_weight = 0
+        filtered_tags = []
+        for tag in track_tags:
+            tag_weight = tag.count
+            if tag_weight is None:
+                continue
+            total_weight += tag_weight
+            if tag_weight >= min_weight:
+                filtered_tags.append((tag.name, tag_weight))
+        if total_weight == 0:
+            # Keep all if total weight is zero to avoid division by zero errors
+            filtered_tags = [(tag.name, tag.count) for tag in track_tags if tag.count is not None]
+
+    if len(filtered_tags) <= top_n:
+        # Short list: a plain sort is cheaper than building a heap
+        return _remove_duplicate_tags(sorted(filtered_tags, key=lambda item: item[1], reverse=True))
+
+    # Pop tags heaviest-first and stop as soon as top_n unique tags are collected
+    return _remove_duplicate_tags(_iter_by_weight(filtered_tags), limit=top_n)
+
+
+def get_lastfm_tags_many(pairs: List[Tuple[str, str]], top_n: int = 5, min_weight: float = 60, workers: int = 8) -> List[List[Tuple[str, int]]]:
+    """
+    Retrieves Last.fm tags for many tracks concurrently, overlapping the HTTP round-trips
+    over the shared client's connection pool.
 
-    # Remove duplicate tags
-    deduplicated_tags_weights = _remove_duplicate_tags(sorted_tags_weights)
+    Args:
+        pairs: A list of (artist name, track name) tuples.
+        top_n: Maximum number of top tags to return per track.
+        min_weight: Minimum weight threshold for tags.
+        workers: Number of worker threads issuing requests.
 
-    return deduplicated_tags_weights[:top_n]
+    Returns:
+        A list with the result of get_lastfm_tags for each pair, in the same order as pairs.
+    """
+    if not pairs:
+        return []
+    _get_client()  # Fail fast (missing API key) before spawning workers
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda pair: get_lastfm_tags(pair[0], pair[1], top_n=top_n, min_weight=min_weight), pairs))
 
 
 def main(artist_name: str, track_name: str) -> None:
@@ -100,7 +183,8 @@ def main(artist_name: str, track_name: str) -> None:
     min_weight_threshold = 70  # Example min_weight value
 
     try:
-        tags_and_weights = get_lastfm_tags(artist_name, track_name, top_n=top_n, min_weight=min_weight_threshold)
+        tags_and_weights = get_lastfm_tags(artist_name, track_name, top_n=top_n, min_weight=min_weight_threshold,
+                                           speculative_artist=True)
 
         if tags_and_weights:
             print(f"\nTop {top_n} tags (>= {min_weight_threshold:.0f}% weight) for '{track_name}' by '{artist_name}' (Duplicates Removed):")
@@ -111,7 +195,7 @@ def main(artist_name: str, track_name: str) -> None:
                 print(f"No tags found for '{track_name}' by '{artist_name}' with specified criteria.")
 
     except Exception as e:
-        logger.error(f"Error retrieving tags: {e}")
+        logger.error("Error retrieving tags: %s", e)
         print(f"An error occurred: {e}") # User-friendly error message
 
 
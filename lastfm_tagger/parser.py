@@ -2,16 +2,18 @@
 from typing import List, Dict, Any
 
 import logging
-from .models import TrackGetTopTagsResponse, TagModel, ArtistGetTopTagsResponse
+from .models import TagModel
 
 logger = logging.getLogger(__name__)
 
-def parse_track_tags(api_response: Dict[str, Any]) -> List[TagModel]:
+
+def _parse_tags(api_response: Dict[str, Any]) -> List[TagModel]:
     """
-    Parses the Last.fm API response (for track.getTopTags) to extract track tags using Pydantic models.
+    Parses a Last.fm API response to extract tags. track.getTopTags and artist.getTopTags
+    share the same {'toptags': {'tag': [...]}} shape, so one parser handles both.
 
     Args:
-        api_response: A dictionary representing the JSON response from the Last.fm API (track.getTopTags).
+        api_response: A dictionary representing the JSON response from the Last.fm API.
 
     Returns:
         A list of TagModel objects.
@@ -19,36 +21,21 @@ def parse_track_tags(api_response: Dict[str, Any]) -> List[TagModel]:
     """
     tags: List[TagModel] = []
     try:
-        track_top_tags_response = TrackGetTopTagsResponse.parse_obj(api_response)
-        if track_top_tags_response.toptags and track_top_tags_response.toptags.tag:
-            tags = track_top_tags_response.toptags.tag
-        else:
-            logger.info("No track tags found in the API response or tags list is empty.")
+        raw_tags = (api_response.get('toptags') or {}).get('tag') or []
+        if isinstance(raw_tags, dict):  # Last.fm returns a bare object instead of a list for a single tag
+            raw_tags = [raw_tags]
+        tags = [
+            TagModel(name=tag.get('name', ''), url=tag.get('url', ''), count=tag.get('count'))
+            for tag in raw_tags if isinstance(tag, dict)
+        ]
+        if not tags:
+            logger.info("No tags found in the API response or tags list is empty.")
     except Exception as e:
-        logger.error(f"Error parsing track tags API response with Pydantic model: {e}")
-        logger.debug(f"API Response causing error: {api_response}")
+        logger.error("Error parsing tags API response: %s", e)
+        logger.debug("API Response causing error: %s", api_response)
     return tags
 
 
-def parse_artist_tags(api_response: Dict[str, Any]) -> List[TagModel]:
-    """
-    Parses the Last.fm API response (for artist.getTopTags) to extract artist tags using Pydantic models.
-
-    Args:
-        api_response: A dictionary representing the JSON response from the Last.fm API (artist.getTopTags).
-
-    Returns:
-        A list of TagModel objects.
-        Returns an empty list if no tags are found or if the response format is invalid.
-    """
-    tags: List[TagModel] = []
-    try:
-        artist_top_tags_response = ArtistGetTopTagsResponse.parse_obj(api_response)
-        if artist_top_tags_response.toptags and artist_top_tags_response.toptags.tag:
-            tags = artist_top_tags_response.toptags.tag
-        else:
-            logger.info("No artist tags found in the API response or tags list is empty.")
-    except Exception as e:
-        logger.error(f"Error parsing artist tags API response with Pydantic model: {e}")
-        logger.debug(f"API Response causing error: {api_response}")
-    return tags
\ No newline at end of file
+# Both top tags methods return the same response shape
+parse_track_tags = _parse_tags
+parse_artist_tags = _parse_tags
@@ -0,0 +1,130 @@
+#!filepath: lastfm_tagger/response_cache.py
+import atexit
+import logging
+import os
+import pathlib
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# On-disk cache file, stored next to the .env file in the project root
+DEFAULT_CACHE_PATH = pathlib.Path(__file__).parent.parent / '.lastfm_cache.json'
+
+# Maximum number of cached responses; the least recently used ones are dropped first
+MAX_CACHE_ENTRIES = 2000
+
+
+class ResponseCache:
+    """
+    Persistent cache of Last.fm API responses with their ETag / Last-Modified validators.
+    Used to send conditional GET requests, so unchanged responses come back as a bodiless 304.
+    The cache is loaded lazily and written back to disk on save().
+    It holds at most max_entries responses, evicting the least recently used ones.
+    Use get_response_cache() to get the instance shared by every client using a cache file.
+    """
+
+    def __init__(self, cache_path: pathlib.Path = DEFAULT_CACHE_PATH, max_entries: int = MAX_CACHE_ENTRIES):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(tag_cache_key: Tuple[str, str, str]) -> str:
+        """
+        Builds a cache key from the client's (method, artist, track) tag cache key, whose names
+        are already normalized, so spelling variants of a name share one entry.
+        """
+        return '\t'.join(tag_cache_key)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Loads the cache file on first use. A missing or corrupt file yields an empty cache."""
+        if self._entries is None:
+            try:
+                self._entries = orjson.loads(self.cache_path.read_bytes())
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, orjson.JSONDecodeError) as e:
+                logger.warning("Could not read Last.fm response cache %s: %s", self.cache_path, e)
+                self._entries = {}
+        return self._entries
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """Returns the If-None-Match / If-Modified-Since headers for a cached response, if any."""
+        with self._lock:
+            entry = self._load().get(key)
+        headers: Dict[str, str] = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def get_body(self, key: str) -> Dict:
+        """Returns the cached response body for a key, or an empty dict if not cached."""
+        with self._lock:
+            entries = self._load()
+            entry = entries.pop(key, None)
+            if entry is None:
+                return {}
+            entries[key] = entry  # Move to the end: most recently used
+        return entry['body']
+
+    def store(self, key: str, etag: Optional[str], last_modified: Optional[str], body: Dict) -> None:
+        """Stores a response body along with its validators. Responses without validators are skipped."""
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            entries = self._load()
+            entries.pop(key, None)  # Re-insert at the end: most recently used
+            entries[key] = {'etag': etag, 'last_modified': last_modified, 'body': body}
+            while len(entries) > self.max_entries:
+                del entries[next(iter(entries))]  # Dicts keep insertion order: oldest first
+            self._dirty = True
+
+    def save(self) -> None:
+        """
+        Writes the cache to disk if it changed since it was loaded. The content goes to a
+        temporary file that is moved over the cache file, so an interrupted write never
+        leaves a truncated cache behind.
+        """
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=str(self.cache_path.parent), prefix='.lastfm_cache.', suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as tmp_file:
+                        tmp_file.write(orjson.dumps(self._entries))
+                    os.replace(tmp_path, str(self.cache_path))
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+                self._dirty = False
+                logger.debug("Last.fm response cache saved to %s", self.cache_path)
+            except OSError as e:
+                logger.warning("Could not write Last.fm response cache %s: %s", self.cache_path, e)
+
+
+_shared_caches: Dict[pathlib.Path, ResponseCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_response_cache(cache_path: pathlib.Path = DEFAULT_CACHE_PATH) -> ResponseCache:
+    """
+    Returns the ResponseCache shared by every client using cache_path, creating it on first use.
+    With one instance per file, clients never overwrite each other's entries when saving,
+    and the cache is written back once at interpreter exit.
+    """
+    with _shared_caches_lock:
+        cache = _shared_caches.get(cache_path)
+        if cache is None:
+            cache = _shared_caches[cache_path] = ResponseCache(cache_path)
+            atexit.register(cache.save)
+        return cache
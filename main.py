@@ -1,34 +1,34 @@
 # path main.py
 from __future__ import annotations
+import _bootstrap  # Must come first: sets TensorFlow environment variables before any TF import
+import functools
+import operator
 import pathlib
-from dataclasses import dataclass, field
-from typing import Callable, Optional, List, Any
+from typing import Callable, Optional, List, Any, Dict, Set, Tuple
 import os
 import colorama
-from colorama import Fore, Back, Style
+from colorama import Fore, Style
 
-from numpy.f2py.cfuncs import callbacks
-
-# Set TF_CPP_MIN_LOG_LEVEL environment variable to suppress TensorFlow messages
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # remove it for debugging
 import platform
+import stat
 import logging
 from enum import Enum, auto
-import keyboard
-from queue import Queue
-from dotenv import load_dotenv, set_key
+from dotenv import load_dotenv
 
+from ai_results_cache import AIResultsCache
+from env_file import save_env_values
+from input_backend import key_mode, line_mode, read_key
 # Import MusicnnSettings from musicnn_tagger/config.py
-from musicnn_tagger.config import MusicnnSettings
+from musicnn_tagger.config import MusicnnSettings, get_settings as get_musicnn_settings
 # Import LastFMSettings from lastfm_tagger.config
-from lastfm_tagger.config import LastFMSettings
+from lastfm_tagger.config import LastFMSettings, get_settings as get_lastfm_settings
 
 import multiprocessing  # Import for multiprocessing
-import time
 import sys  # For flushing output
+import threading
+import time
 import queue  # Import the queue module
-# Import worker_process function
-from music_tagger import worker_process
+import concurrent.futures
 
 colorama.init()
 # Color constants
@@ -39,35 +39,59 @@ C_GENRE_SUGGESTION = Fore.GREEN
 C_RESET = Style.RESET_ALL
 C_BOLD = Style.BRIGHT
 
+# Load environment variables from .env file in the project directory once, at import time
+_DOTENV_PATH = pathlib.Path(__file__).parent / '.env'
+load_dotenv(dotenv_path=_DOTENV_PATH, encoding='utf-8', verbose=False)
+
+
 # Replace BaseSettings with a regular class
 class AppSettings:
     """
     Global application settings container, loaded from and saved to .env file using dotenv.
     """
-    # Removed model_config
+    __slots__ = ('dotenv_path', 'auto_apply_tags', 'default_music_dir', 'ai_cache_enabled',
+                 'worker_count', 'save_immediately', 'skip_tagged_files')
 
     auto_apply_tags: bool
     default_music_dir: Optional[str]
+    ai_cache_enabled: bool
+    worker_count: int
+    save_immediately: bool
+    skip_tagged_files: bool
 
     def __init__(self):
-        # Load environment variables from .env file in the parent directory
-        self.dotenv_path = pathlib.Path(__file__).parent / '.env'
-        load_dotenv(dotenv_path=self.dotenv_path, encoding='utf-8', verbose=False)  # Load .env
+        self.dotenv_path = _DOTENV_PATH  # .env is already loaded at import time
 
         # Initialize settings from environment variables or defaults
         self.auto_apply_tags = os.getenv("AUTO_APPLY_TAGS", 'False').lower() == 'true'  # Default to False if not set
         self.default_music_dir = os.getenv("DEFAULT_MUSIC_DIR")  # Can be None if not set
+        self.ai_cache_enabled = os.getenv("AI_CACHE_ENABLED", 'True').lower() == 'true'  # Reuse AI results of unchanged files
+        self.worker_count = int(os.getenv("WORKER_COUNT", 0))  # 0 means one worker per CPU core
+        # Write .env on every change instead of batching changes made in quick succession
+        self.save_immediately = os.getenv("SAVE_SETTINGS_IMMEDIATELY", 'False').lower() == 'true'
+        # Leave files that already have a genre tag out of a run (no AI analysis, no prompt)
+        self.skip_tagged_files = os.getenv("SKIP_TAGGED_FILES", 'False').lower() == 'true'
 
     def save_settings(self):
         """Save current settings to .env file."""
-        set_key(self.dotenv_path, "AUTO_APPLY_TAGS", str(self.auto_apply_tags).upper())  # Save auto_apply_tags
-        if self.default_music_dir:  # Only save if not None
-            set_key(self.dotenv_path, "DEFAULT_MUSIC_DIR", self.default_music_dir)
-        else:  # Remove from .env if None
-            set_key(self.dotenv_path, "DEFAULT_MUSIC_DIR", '')  # Empty string will be read as None next time
+        save_env_values(self.dotenv_path, {
+            "AUTO_APPLY_TAGS": str(self.auto_apply_tags).upper(),
+            # Empty string is saved when not set, and will be read as None next time
+            "DEFAULT_MUSIC_DIR": self.default_music_dir or '',
+            "AI_CACHE_ENABLED": str(self.ai_cache_enabled).upper(),
+            "WORKER_COUNT": str(self.worker_count),
+            "SAVE_SETTINGS_IMMEDIATELY": str(self.save_immediately).upper(),
+            "SKIP_TAGGED_FILES": str(self.skip_tagged_files).upper(),
+        })
         logger.debug("AppSettings saved to .env")
 
 
+@functools.lru_cache(maxsize=1)
+def get_app_settings() -> AppSettings:
+    """Returns a process-wide AppSettings instance, built on first use."""
+    return AppSettings()
+
+
 # Configure logging with ISO timestamp
 logging.basicConfig(
     level=logging.INFO,
@@ -76,6 +100,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Upper bound on the number of file paths sent to a worker in one queue message
+MAX_CHUNK_SIZE = 16
+# Text of the non-selectable header item at the top of the root menu
+MENU_HEADER_TEXT = "-- Music Tagger Menu --"
+# How long stopping the worker pool waits for workers to finish before terminating them
+WORKER_STOP_TIMEOUT_SECONDS = 5.0
+# Quiet period after the last value change before settings are written to .env
+SAVE_DEBOUNCE_SECONDS = 0.3
+
 
 class MenuItemType(Enum):
     """Enumeration defining types of menu items."""
@@ -85,18 +118,104 @@ class MenuItemType(Enum):
     ACTION = auto()
 
 
-@dataclass
 class MenuItem:
-    """Represents a menu item with navigation and interaction properties."""
-    text: str
-    type: MenuItemType
-    value: Any = None
-    children: List['MenuItem'] = field(default_factory=list)
-    parent: Optional['MenuItem'] = None
-    callback: Optional[Callable] = None
-    min_value: Optional[float] = None
-    max_value: Optional[float] = None
-    step: Optional[float] = None
+    """
+    Represents a menu item with navigation and interaction properties.
+
+    Uses __slots__ (a plain class, since dataclass(slots=True) needs Python 3.10) so the
+    attribute reads done on every redraw skip the instance __dict__.
+    """
+    __slots__ = ('text', 'type', 'value', 'children', 'parent', 'callback',
+                 'min_value', 'max_value', 'step', 'save_callback', 'render')
+
+    def __init__(self, text: str, type: MenuItemType, value: Any = None,
+                 children: Optional[List['MenuItem']] = None, parent: Optional['MenuItem'] = None,
+                 callback: Optional[Callable] = None, min_value: Optional[float] = None,
+                 max_value: Optional[float] = None, step: Optional[float] = None,
+                 save_callback: Optional[Callable] = None):
+        self.text = text
+        self.type = type
+        self.value = value
+        self.children: List['MenuItem'] = children if children is not None else []
+        self.parent = parent
+        self.callback = callback
+        self.min_value = min_value
+        self.max_value = max_value
+        self.step = step
+        self.save_callback = save_callback  # Persists the settings object changed by a VALUE item
+        # Line renderer picked once from the (fixed) item type, so drawing a frame needs no type checks
+        if type == MenuItemType.TOGGLE:
+            self.render: Callable[[str], str] = self._render_toggle
+        elif type == MenuItemType.VALUE:
+            self.render = self._render_value
+        else:
+            self.render = self._render_plain
+
+    def _render_toggle(self, prefix: str) -> str:
+        return f"{prefix}{self.text} [{'ON' if self.value() else 'OFF'}]"
+
+    def _render_value(self, prefix: str) -> str:
+        return f"{prefix}{self.text}: {self.value()}"
+
+    def _render_plain(self, prefix: str) -> str:
+        return prefix + self.text
+
+    def __repr__(self) -> str:
+        return f"MenuItem(text={self.text!r}, type={self.type})"
+
+
+# Shape of the menu tree as (text, type, options) rows, turned into MenuItems by InteractiveMenu._build_menu.
+# Options: 'callback' names an InteractiveMenu method, or is a (method name, *args) tuple;
+# 'value' is an attribute path on the menu ('settings.auto_apply_tags') or a (method name, *args) tuple;
+# 'save' names the settings attribute whose save_settings persists a VALUE item; 'children' nests rows.
+_MUSICNN_MODELS_SPEC = (
+    ("(Very Accurate, Slow)", 'MSD_musicnn_big'),
+    ("(State-of-the-art Accuracy, Medium Speed)", 'MTT_musicnn'),
+    ("(Good Accuracy, Medium Speed)", 'MTT_vgg'),
+    ("(Lower Accuracy, Very Fast)", 'MSD_musicnn'),
+    ("(Lower Accuracy, Very Fast)", 'MSD_vgg'),
+)
+_MENU_SPEC = (
+    (MENU_HEADER_TEXT, MenuItemType.ACTION, {}),  # Placeholder "header" item, no action when selected
+    ("Select Music Root Folder", MenuItemType.ACTION, {'callback': '_select_folder'}),
+    ("Process Directory", MenuItemType.ACTION, {'callback': '_process_music_directory'}),
+    ("Settings", MenuItemType.SUBMENU, {'children': (
+        ("Processing Engine", MenuItemType.SUBMENU, {'children': (
+            ("Musicnn AI Tagger", MenuItemType.SUBMENU, {'children': (
+                ("Enable/Disable", MenuItemType.TOGGLE, {
+                    'value': 'musicnn_settings.enabled', 'callback': '_toggle_musiccn_enabled'}),
+                ("Models List", MenuItemType.SUBMENU, {'children': tuple(
+                    (f"{C_BOLD}{description}{C_RESET} {C_AI}{model_name}{C_RESET}", MenuItemType.TOGGLE, {
+                        'value': ('_is_musiccn_model_enabled', model_name),
+                        'callback': ('_toggle_musiccn_model_enabled', model_name)})
+                    for description, model_name in _MUSICNN_MODELS_SPEC
+                )}),
+                ("Threshold Weight", MenuItemType.VALUE, {
+                    'value': 'musicnn_settings.threshold_weight', 'min_value': 0.0, 'max_value': 1.0, 'step': 0.1,
+                    'callback': '_set_musiccn_threshold_weight', 'save': 'musicnn_settings'}),
+                ("Genres Count", MenuItemType.VALUE, {
+                    'value': 'musicnn_settings.genres_count', 'min_value': 1, 'max_value': 10, 'step': 1,
+                    'callback': '_set_musiccn_genres_count', 'save': 'musicnn_settings'}),
+            )}),
+            ("LastFM Grabber", MenuItemType.SUBMENU, {'children': (
+                ("Enable/Disable", MenuItemType.TOGGLE, {
+                    'value': 'lastfm_settings.enabled', 'callback': '_toggle_lastfm_enabled'}),
+                ("Threshold Weight", MenuItemType.VALUE, {
+                    'value': 'lastfm_settings.threshold_weight', 'min_value': 0.0, 'max_value': 1.0, 'step': 0.1,
+                    'callback': '_set_lastfm_threshold_weight', 'save': 'lastfm_settings'}),
+            )}),
+        )}),
+        ("Auto-apply Tags", MenuItemType.TOGGLE, {
+            'value': 'settings.auto_apply_tags', 'callback': '_toggle_auto_apply'}),
+        ("Skip Already Tagged Files", MenuItemType.TOGGLE, {
+            'value': 'settings.skip_tagged_files', 'callback': '_toggle_skip_tagged_files'}),
+        ("Worker Processes (0 = auto)", MenuItemType.VALUE, {
+            # Inference is CPU-bound, more workers than cores only adds overhead
+            'value': 'settings.worker_count', 'min_value': 0, 'max_value': os.cpu_count() or 1, 'step': 1,
+            'callback': '_set_worker_count', 'save': 'settings'}),
+    )}),
+    ("Exit", MenuItemType.ACTION, {'callback': '_exit_program'}),
+)
 
 
 class InteractiveMenu:
@@ -107,6 +226,11 @@ class InteractiveMenu:
     and dynamic value updates.
     """
 
+    # Static pieces of every menu frame
+    PREFIX_SELECTED = "→ "
+    PREFIX_NONE = "  "
+    NAVIGATION_HELP = "\nUse ↑↓ to navigate, ← → to modify values\nEnter to select, <—Backspace to go back to parent menu\nEsc to go root menu"
+
     def __init__(self, settings: AppSettings, musicnn_settings: MusicnnSettings, lastfm_settings: LastFMSettings,
                  music_tagger: 'MusicTagger'):  # Use AppSettings, MusicnnSettings, and LastFMSettings
         """
@@ -125,208 +249,247 @@ class InteractiveMenu:
         self.music_tagger = music_tagger  # Store MusicTagger instance
         self.current_menu: List[MenuItem] = []
         self.selected_index = 1
-        self.event_queue = Queue()
+        # directory -> (directory mtime in ns, music files count), so redraws don't rescan the library
+        self._music_files_count_cache: Dict[str, Tuple[int, int]] = {}
+        self._music_files_count = 0  # Shown in the menu header, refreshed only when the library may have changed
+        self._dirty = True  # Redraw the menu only when something visible changed
+        self._last_frame: Optional[str] = None  # Last frame written; identical frames are not rewritten
+        if platform.system() == "Windows":
+            self._enable_virtual_terminal()
+        # Settings saves run on a single background writer thread fed through this queue
+        self._save_queue: queue.Queue = queue.Queue()
+        self._save_thread = threading.Thread(target=self._save_worker, daemon=True)
+        self._save_thread.start()
         self._setup_root_menu()
+        # Key name -> handler, so each key press is one dict lookup instead of a chain of comparisons
+        self._key_handlers: Dict[str, Callable[[], bool]] = {
+            'up': functools.partial(self._move_selection, -1),
+            'down': functools.partial(self._move_selection, 1),
+            'enter': self._handle_selection,
+            'right': self._handle_value_change_increase,
+            'left': self._handle_value_change_decrease,
+            'shift+right': functools.partial(self._handle_value_change_increase, True),  # Shift: ten steps
+            'shift+left': functools.partial(self._handle_value_change_decrease, True),
+            'esc': self._handle_escape,
+            'backspace': self._handle_back,
+        }
 
         # Multiprocessing Queues and Processes
-        self.input_queue = multiprocessing.Queue()
+        self.input_queue = multiprocessing.JoinableQueue()  # Workers mark each chunk done, so a run can join() on it
         self.output_queue = multiprocessing.Queue()
         self.processes = []  # List to hold worker processes
+        self._workers_settings_key = None  # Musicnn settings the running workers were started with
+        self.ai_results_cache = AIResultsCache()  # AI results of earlier runs, keyed by file path
+        self._results_lock = threading.Lock()  # Guards results shared with the result drainer thread
+        # Folder picker chosen once: native dialog on Windows (Tk as fallback), console input elsewhere
+        self._pick_folder: Callable[[], Optional[str]] = (
+            self._get_native_dialog_input if platform.system() == "Windows" else self._get_console_input
+        )
+        self._tk_root = None  # Hidden Tk root, created on the first dialog and reused afterwards
+        # (directory, future file list) of the scan started while the folder dialog is open
+        self._prefetched_scan: Optional[Tuple[str, concurrent.futures.Future]] = None
+        self._refresh_music_files_count()
+
+    def _bind(self, reference: Any) -> Optional[Callable]:
+        """Resolves a _MENU_SPEC method reference (a name or a (name, *args) tuple) to a callable."""
+        if reference is None:
+            return None
+        if isinstance(reference, tuple):
+            return functools.partial(getattr(self, reference[0]), *reference[1:])
+        return getattr(self, reference)
+
+    def _bind_value(self, reference: Any) -> Optional[Callable[[], Any]]:
+        """
+        Resolves a _MENU_SPEC value reference to a zero-argument getter. Attribute paths use
+        partial(attrgetter), which runs entirely in C instead of a Python frame per redraw.
+        """
+        if isinstance(reference, str):
+            return functools.partial(operator.attrgetter(reference), self)
+        return self._bind(reference)
+
+    def _build_menu(self, spec: tuple, parent: Optional[MenuItem] = None) -> List[MenuItem]:
+        """
+        Builds the MenuItems for a _MENU_SPEC level, recursing into submenus.
+        Each item's parent is the submenu item containing it (None at the root).
+        """
+        items = []
+        for text, item_type, options in spec:
+            save_settings_of = options.get('save')
+            item = MenuItem(
+                text=text,
+                type=item_type,
+                value=self._bind_value(options.get('value')),
+                parent=parent,
+                callback=self._bind(options.get('callback')),
+                min_value=options.get('min_value'),
+                max_value=options.get('max_value'),
+                step=options.get('step'),
+                save_callback=getattr(self, save_settings_of).save_settings if save_settings_of else None,
+            )
+            item.children = self._build_menu(options.get('children', ()), item)
+            items.append(item)
+        return items
 
     def _setup_root_menu(self) -> None:
         """Initialize the root menu structure with all submenus and items."""
-        root_items = [
-            MenuItem(
-                text="-- Music Tagger Menu --",  # Placeholder "header" item
-                type=MenuItemType.ACTION,  # Use ACTION type
-                callback=None  # No action when selected
-            ),
-            MenuItem(
-                text="Select Music Root Folder",
-                type=MenuItemType.ACTION,
-                callback=self._select_folder
-            ),
-            MenuItem(
-                text="Process Directory",  # New menu item to trigger directory processing
-                type=MenuItemType.ACTION,
-                callback=self._process_music_directory
-            ),
-            MenuItem(
-                text="Settings",
-                type=MenuItemType.SUBMENU,
-                children=[],  # Children will be populated next
-            ),
-            MenuItem(
-                text="Exit",
-                type=MenuItemType.ACTION,
-                callback=self._exit_program
-            )
-        ]
-
-        settings_submenu = root_items[3]  # Get the 'Settings' submenu item
-        settings_submenu.children = [
-            MenuItem(
-                text="Processing Engine",
-                type=MenuItemType.SUBMENU,
-                children=[],  # Children will be populated next
-                parent=settings_submenu  # Set parent for back navigation
-            ),
-            MenuItem(
-                text="Auto-apply Tags",
-                type=MenuItemType.TOGGLE,
-                value=lambda: self.settings.auto_apply_tags,
-                callback=self._toggle_auto_apply,
-                parent=settings_submenu  # Set parent for back navigation
-            )
-        ]
-
-        processing_engine_submenu = settings_submenu.children[0]  # Get 'Processing Engine' submenu
-        processing_engine_submenu.children = [
-            MenuItem(
-                text="Musicnn AI Tagger",
-                type=MenuItemType.SUBMENU,
-                children=[],  # Children will be populated next
-                parent=settings_submenu  # Set parent for back navigation
-            ),
-            MenuItem(
-                text="LastFM Grabber",
-                type=MenuItemType.SUBMENU,
-                children=[],  # Children will be populated next
-                parent=settings_submenu  # Set parent for back navigation
-            )
-        ]
-        musiccn_submenu = processing_engine_submenu.children[0]  # Get 'Musicnn AI Tagger' submenu
-        musiccn_submenu.children = [
-            MenuItem(
-                text="Enable/Disable",
-                type=MenuItemType.TOGGLE,
-                value=lambda: self.musicnn_settings.enabled,  # Use musicnn_settings
-                callback=self._toggle_musiccn_enabled,  # Updated callback name
-                parent=processing_engine_submenu  # Set parent for back navigation
-            ),
-            MenuItem( # New menu item for Models List
-                text="Models List",
-                type=MenuItemType.SUBMENU,
-                children=[],  # Children will be populated next
-                parent=processing_engine_submenu  # Set parent for back navigation
-            ),
-            MenuItem(
-                text="Threshold Weight",
-                type=MenuItemType.VALUE,
-                value=lambda: self.musicnn_settings.threshold_weight,  # Use musicnn_settings
-                min_value=0.0,
-                max_value=1.0,
-                step=0.1,
-                callback=self._set_musiccn_threshold_weight,  # Updated callback name
-                parent=processing_engine_submenu  # Set parent for back navigation
-            ),
-            MenuItem(  # New menu item for genres count
-                text="Genres Count",
-                type=MenuItemType.VALUE,
-                value=lambda: self.musicnn_settings.genres_count,  # Use musicnn_settings
-                min_value=1,
-                max_value=10,  # Example max genres count
-                step=1,
-                callback=self._set_musiccn_genres_count,  # New callback
-                parent=processing_engine_submenu
-            ),
-        ]
-
-        musiccn_models_list_submenu = musiccn_submenu.children[1] # Get 'Models List' submenu
-        musiccn_models_list_submenu.children = [
-            MenuItem(
-                text=f"{C_BOLD}(Very Accurate, Slow){C_RESET} {C_AI}MSD_musicnn_big{C_RESET}",
-                type=MenuItemType.TOGGLE,
-                value=lambda: self.musicnn_settings.enabled_models.get('MSD_musicnn_big', False),
-                callback=lambda: self._toggle_musiccn_model_enabled('MSD_musicnn_big'),
-                parent=musiccn_submenu
-            ),
-            MenuItem(
-                text=f"{C_BOLD}(State-of-the-art Accuracy, Medium Speed){C_RESET} {C_AI}MTT_musicnn{C_RESET}",
-                type=MenuItemType.TOGGLE,
-                value=lambda: self.musicnn_settings.enabled_models.get('MTT_musicnn', False),
-                callback=lambda: self._toggle_musiccn_model_enabled('MTT_musicnn'),
-                parent=musiccn_submenu
-            ),
-            MenuItem(
-                text=f"{C_BOLD}(Good Accuracy, Medium Speed){C_RESET} {C_AI}MTT_vgg{C_RESET}",
-                type=MenuItemType.TOGGLE,
-                value=lambda: self.musicnn_settings.enabled_models.get('MTT_vgg', False),
-                callback=lambda: self._toggle_musiccn_model_enabled('MTT_vgg'),
-                parent=musiccn_submenu
-            ),
-            MenuItem(
-                text=f"{C_BOLD}(Lower Accuracy, Very Fast){C_RESET} {C_AI}MSD_musicnn{C_RESET}",
-                type=MenuItemType.TOGGLE,
-                value=lambda: self.musicnn_settings.enabled_models.get('MSD_musicnn', False),
-                callback=lambda: self._toggle_musiccn_model_enabled('MSD_musicnn'),
-                parent=musiccn_submenu
-            ),
-            MenuItem(
-                text=f"{C_BOLD}(Lower Accuracy, Very Fast){C_RESET} {C_AI}MSD_vgg{C_RESET}",
-                type=MenuItemType.TOGGLE,
-                value=lambda: self.musicnn_settings.enabled_models.get('MSD_vgg', False),
-                callback=lambda: self._toggle_musiccn_model_enabled('MSD_vgg'),
-                parent=musiccn_submenu
-            ),
-        ]
-        lastfm_submenu = processing_engine_submenu.children[1]  # Get 'LastFM Grabber' submenu
-        lastfm_submenu.children = [
-            MenuItem(
-                text="Enable/Disable",
-                type=MenuItemType.TOGGLE,
-                value=lambda: self.lastfm_settings.enabled,  # Use lastfm_settings
-                callback=self._toggle_lastfm_enabled,  # Updated callback names
-                parent=processing_engine_submenu  # Set parent for back navigation
-            ),
-            MenuItem(
-                text="Threshold Weight",
-                type=MenuItemType.VALUE,
-                value=lambda: self.lastfm_settings.threshold_weight,  # Use lastfm_settings
-                min_value=0.0,
-                max_value=1.0,
-                step=0.1,
-                callback=self._set_lastfm_threshold_weight,  # Updated callback name
-                parent=processing_engine_submenu  # Set parent for back navigation
-            )
-        ]
+        root_items = self._build_menu(_MENU_SPEC)
 
         self.root_menu = root_items  # Assign the constructed root menu
         self.current_menu = self.root_menu
 
+    @staticmethod
+    def _enable_virtual_terminal() -> None:
+        """
+        Turns on ANSI escape sequence processing for the Windows console (Windows 10+), so screen
+        clears and colors are handled natively. Older consoles keep colorama's translation.
+        """
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+            mode = ctypes.c_uint32()
+            if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+                kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        except (AttributeError, OSError) as e:
+            logger.debug(f"Could not enable virtual terminal processing: {e}")
+
     def _clear_screen(self) -> None:
-        """Clear the console screen in a cross-platform manner."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """
+        Clear the console screen in a cross-platform manner.
+        Uses ANSI escape sequences (translated by colorama on legacy Windows consoles)
+        instead of spawning a 'cls'/'clear' shell process on every redraw.
+        """
+        print('\x1b[2J\x1b[H', end='', flush=True)
 
     def _draw_menu(self) -> None:
-        """Render the current menu state to the console."""
-        self._clear_screen()
+        """
+        Render the current menu state to the console.
+        The whole frame is assembled first and written with a single stdout write,
+        and skipped entirely if it is identical to the frame already on screen.
+        """
+        lines: List[str] = []
         if self.settings.default_music_dir:
-            print(f"Default music dir: {self.settings.default_music_dir}")
-            from music_tagger import MusicTagger
-            MusicTagger().get_music_files_count(self.settings.default_music_dir)
+            lines.append(f"Default music dir: {self.settings.default_music_dir}")
+            lines.append(f"🔎 Found {C_PROMPT}{self._music_files_count}{C_RESET}{C_BOLD} supported{C_RESET} music files")
             if self.settings.auto_apply_tags:
-                print(f"Auto apply tags setting state is ON [u can change it on settings]")
-            print("================\n")
+                lines.append("Auto apply tags setting state is ON [u can change it on settings]")
+            lines.append("================\n")
 
         for i, item in enumerate(self.current_menu):
-            if item.text == "-- Music Tagger Menu --":  # Check for the placeholder item
-                prefix = "  "  # Always use space prefix for placeholder
+            if item.text == MENU_HEADER_TEXT:  # Always use space prefix for placeholder
+                prefix = self.PREFIX_NONE
             else:
-                prefix = "→ " if i == self.selected_index else "  " # Standard prefix logic
-
-            if item.type == MenuItemType.TOGGLE:
-                value = item.value()
-                status = "ON" if value else "OFF"
-                print(f"{prefix}{item.text} [{status}]")
-            elif item.type == MenuItemType.VALUE:
-                value = item.value()
-                print(f"{prefix}{item.text}: {value}")
-            else:
-                print(f"{prefix}{item.text}")
+                prefix = self.PREFIX_SELECTED if i == self.selected_index else self.PREFIX_NONE
+
+            lines.append(item.render(prefix))
+
+        lines.append(self.NAVIGATION_HELP)
+        frame = "\n".join(lines) + "\n"
+        if frame == self._last_frame:
+            return
+        self._clear_screen()
+        sys.stdout.write(frame)
+        sys.stdout.flush()
+        self._last_frame = frame
+
+    @staticmethod
+    def _stat_directory(directory: str) -> Optional[os.stat_result]:
+        """
+        Stats a directory once, so callers can check that it exists and reuse its mtime
+        without a separate os.path.isdir() round trip (slow on network-mounted libraries).
+
+        Returns:
+            Optional[os.stat_result]: The stat result, or None if the path is not an accessible directory.
+        """
+        try:
+            dir_stat = os.stat(directory)
+        except OSError:
+            return None
+        return dir_stat if stat.S_ISDIR(dir_stat.st_mode) else None
+
+    def _get_music_files_count(self, directory: str, dir_stat: Optional[os.stat_result] = None) -> int:
+        """
+        Returns the number of supported music files in a directory, rescanning it only
+        when the directory's modification time changes.
+
+        Args:
+            directory: The music root directory.
+            dir_stat: The directory's stat result, if the caller already has it.
+
+        Returns:
+            int: Number of supported music files, 0 if the directory is not accessible.
+        """
+        if dir_stat is None:
+            dir_stat = self._stat_directory(directory)
+            if dir_stat is None:
+                return 0
+        mtime = dir_stat.st_mtime_ns  # Integer ns: exact comparison, no float rounding
+        cached = self._music_files_count_cache.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        prefetched_files = self._take_prefetched_files(directory)
+        if prefetched_files is not None:
+            count = len(prefetched_files)
+        else:
+            count = self.music_tagger.get_music_files_count(directory)
+        self._music_files_count_cache[directory] = (mtime, count)
+        return count
+
+    def _start_prefetch_scan(self, directory: str) -> None:
+        """
+        Starts scanning a directory for music files in a background thread, so the scan overlaps
+        with the user browsing in the folder dialog. The thread is daemonic and never delays exit.
+        """
+        if not directory or self._stat_directory(directory) is None:
+            return
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def scan() -> None:
+            try:
+                future.set_result(self.music_tagger.find_music_files(directory))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=scan, daemon=True).start()
+        self._prefetched_scan = (directory, future)
+
+    def _take_prefetched_files(self, directory: str) -> Optional[List[str]]:
+        """
+        Returns the prefetched music files under directory, or None if no prefetch covers it.
+        The scan is waited for only when directory is the scanned one; a subfolder reuses it
+        only if the scan already finished, since waiting on a whole library walk would be
+        slower than scanning the subfolder alone.
+        """
+        if self._prefetched_scan is None:
+            return None
+        scanned_directory, future = self._prefetched_scan
+        scanned_directory = os.path.normcase(os.path.abspath(scanned_directory))
+        normalized_directory = os.path.normcase(os.path.abspath(directory))
+        if normalized_directory != scanned_directory and not (
+                future.done() and normalized_directory.startswith(scanned_directory.rstrip(os.sep) + os.sep)):
+            return None
+        self._prefetched_scan = None  # Used once; later lookups rescan
+        try:
+            files = future.result()
+        except Exception as e:
+            logger.warning(f"Prefetch scan of {scanned_directory} failed: {e}")
+            return None
+        if normalized_directory == scanned_directory:
+            return files
+        prefix = normalized_directory.rstrip(os.sep) + os.sep
+        return [file_path for file_path in files if os.path.normcase(os.path.abspath(file_path)).startswith(prefix)]
+
+    def _refresh_music_files_count(self, dir_stat: Optional[os.stat_result] = None) -> None:
+        """
+        Updates the music files count shown in the menu header. Called when the music
+        directory changes or after a tagging run, so drawing the menu never touches the disk.
+
+        Args:
+            dir_stat: The music directory's stat result, if the caller already has it.
+        """
+        directory = self.settings.default_music_dir
+        self._music_files_count = self._get_music_files_count(directory, dir_stat) if directory else 0
 
-        print(
-            "\nUse ↑↓ to navigate, ← → to modify values\nEnter to select, <—Backspace to go back to parent menu\nEsc to go root menu")  # Updated navigation instructions
     def _handle_input(self) -> bool:
         """
         Handle keyboard input events.
@@ -335,35 +498,31 @@ class InteractiveMenu:
             bool: False if the menu should exit, True otherwise
         """
         while True:
-            event = keyboard.read_event(suppress=True)
-            if event.event_type == keyboard.KEY_UP:  # Changed to KEY_UP for more reliable key press detection
-                if event.name == 'up':
-                    original_index = self.selected_index
-                    self.selected_index = (self.selected_index - 1) % len(self.current_menu)
-                    if self.current_menu[self.selected_index].text == "-- Music Tagger Menu --": # Skip placeholder
-                        self.selected_index = (self.selected_index - 1) % len(self.current_menu)
-                        if self.selected_index == original_index: # Handle case where only item is placeholder or menu is empty
-                            self.selected_index = 1 # Reset to top or handle as needed
+            key = read_key()
+            handler = self._key_handlers.get(key)
+            if handler is None and key.startswith('shift+'):
+                handler = self._key_handlers.get(key[len('shift+'):])  # e.g. Shift+Up navigates like Up
+            if handler is not None:
+                return handler()
+            # Keys without a handler are ignored: wait for the next key press
+
+    def _move_selection(self, step: int) -> bool:
+        """
+        Move the selection up (step -1) or down (step 1), wrapping around and skipping the header placeholder.
 
-                    break
-                elif event.name == 'down':
-                    original_index = self.selected_index
-                    self.selected_index = (self.selected_index + 1) % len(self.current_menu)
-                    if self.current_menu[self.selected_index].text == "-- Music Tagger Menu --": # Skip placeholder
-                        self.selected_index = (self.selected_index + 1) % len(self.current_menu)
-                        if self.selected_index == original_index: # Handle case where only item is placeholder or menu is empty
-                            self.selected_index = 1 # Reset to top or handle as needed
-                    break
-                elif event.name == 'enter':
-                    return self._handle_selection()
-                elif event.name == 'right':  # Use right arrow for value change
-                    return self._handle_value_change_increase()
-                elif event.name == 'left':  # Use left arrow for value change
-                    return self._handle_value_change_decrease()
-                elif event.name == 'esc':
-                    return self._handle_escape()
-                elif event.name == 'backspace':  # Use backspace for back navigation
-                    return self._handle_back()
+        Returns:
+            bool: True to continue menu operation
+        """
+        menu = self.current_menu
+        menu_length = len(menu)
+        original_index = self.selected_index
+        index = (original_index + step) % menu_length
+        if menu[index].text == MENU_HEADER_TEXT: # Skip placeholder
+            index = (index + step) % menu_length
+            if index == original_index: # Handle case where only item is placeholder or menu is empty
+                index = 1 # Reset to top or handle as needed
+        self.selected_index = index
+        self._dirty = True
         return True
 
     def _handle_selection(self) -> bool:
@@ -374,18 +533,19 @@ class InteractiveMenu:
             bool: False if the menu should exit, True otherwise
         """
         item = self.current_menu[self.selected_index]
+        self._dirty = True
 
         if item.type == MenuItemType.SUBMENU:
             self.current_menu = item.children
             self.selected_index = 0
         elif item.type == MenuItemType.ACTION:
             if item.callback:
-                return item.callback()
+                self._last_frame = None  # Actions print to the console, so the next frame must be redrawn
+                with line_mode():  # Actions may prompt with input()
+                    return item.callback()
         elif item.type == MenuItemType.TOGGLE:
             if item.callback:
-                item.callback()
-                if item.text == "Auto-apply Tags":  # Specific handling for "Auto-apply Tags"
-                    self.settings.save_settings()  # Save AppSettings on toggle
+                item.callback()  # Toggle callbacks schedule their own settings save
 
         return True
 
@@ -396,9 +556,10 @@ class InteractiveMenu:
         Returns:
             bool: True to continue menu operation
         """
-        if self.current_menu != self.root_menu:  # Go back to root
+        if self.current_menu is not self.root_menu:  # Go back to root
             self.current_menu = self.root_menu
             self.selected_index = 1
+            self._dirty = True
         return True
 
     def _handle_back(self) -> bool:
@@ -412,104 +573,217 @@ class InteractiveMenu:
             logger.debug("_handle_back: current_menu is empty, returning True")
             return True
 
-        if self.current_menu == self.root_menu:
+        if self.current_menu is self.root_menu:
             logger.info("_handle_back: Current menu is root menu, returning True")
             return True
-        # Check if the current menu has a parent
-        if self.current_menu and self.current_menu[0].parent:
-            parent_menu_item = self.current_menu[0].parent
-
-            if parent_menu_item.text == 'Settings' and self.current_menu[0].text == 'Processing Engine':
-                if self.current_menu != self.root_menu:  # Go back to root
-                    self.current_menu = self.root_menu
-                    self.selected_index = 1
-                return True
-
-            self.current_menu = parent_menu_item.children
-        else:
-            logger.info("_handle_back: No parent menu found or current_menu is empty or has no parent, staying in current menu.")
+        submenu = self.current_menu[0].parent  # The submenu item whose children are shown
+        if submenu is None:
+            logger.info("_handle_back: No parent menu found, staying in current menu.")
+            return True
 
+        self.current_menu = submenu.parent.children if submenu.parent else self.root_menu
+        self.selected_index = self.current_menu.index(submenu)  # Keep the submenu we came from selected
+        self._dirty = True
         return True
 
-    def _handle_value_change_increase(self) -> bool:
+    def _handle_value_change_increase(self, large_step: bool = False) -> bool:
         """
         Handle value modification for numeric menu items - increase value.
 
+        Args:
+            large_step: Change the value by ten steps (Shift held)
+
         Returns:
             bool: True to continue menu operation
         """
-        item = self.current_menu[self.selected_index]
-        if item.type == MenuItemType.VALUE and item.callback:
-            current_value = item.value()
-            step = item.step or 1
-
-            if keyboard.is_pressed('shift'):
-                step *= 10
-
-            new_value = current_value + step
-            if item.max_value is not None:
-                new_value = min(new_value, item.max_value)
-
-            if isinstance(new_value, float):
-                new_value = round(new_value, 1)
-            item.callback(new_value)
-            if item.text == "Threshold Weight" and item.parent.text == "Musicnn AI Tagger":
-                self.musicnn_settings.save_settings()  # Save MusicnnSettings
-            elif item.text == "Genres Count":
-                self.musicnn_settings.save_settings()  # Save MusicnnSettings
-            elif item.text == "Threshold Weight" and item.parent.text == "LastFM Grabber":
-                self.lastfm_settings.save_settings()  # Save LastFMSettings
-
+        self._apply_value_change(self.current_menu[self.selected_index], 1, large_step)
         return True
 
-    def _handle_value_change_decrease(self) -> bool:
+    def _handle_value_change_decrease(self, large_step: bool = False) -> bool:
         """
         Handle value modification for numeric menu items - decrease value.
 
+        Args:
+            large_step: Change the value by ten steps (Shift held)
+
         Returns:
             bool: True to continue menu operation
         """
-        item = self.current_menu[self.selected_index]
-        if item.type == MenuItemType.VALUE and item.callback:
-            current_value = item.value()
-            step = item.step or 1
-
-            if keyboard.is_pressed('shift'):
-                step *= 10
-
-            new_value = max(0.0, current_value - step)  # Use max to ensure value >= 0, and 0.0 to handle float correctly.
-
-            if item.min_value is not None:  # Apply min_value constraint if present
-                new_value = max(new_value, item.min_value)
-
-            if item.max_value is not None:
-                new_value = min(new_value, item.max_value)
-
-            if isinstance(new_value, float):
-                new_value = round(new_value, 1)
-            item.callback(new_value)
-            if item.text == "Threshold Weight" and item.parent.text == "Musicnn AI Tagger":
-                self.musicnn_settings.save_settings()  # Save MusicnnSettings
-            elif item.text == "Genres Count":
-                self.musicnn_settings.save_settings()  # Save MusicnnSettings
-            elif item.text == "Threshold Weight" and item.parent.text == "LastFM Grabber":
-                self.lastfm_settings.save_settings()  # Save LastFMSettings
+        self._apply_value_change(self.current_menu[self.selected_index], -1, large_step)
         return True
 
-    def _start_workers(self, musicnn_settings: MusicnnSettings, num_workers: int = 3):
+    def _apply_value_change(self, item: MenuItem, delta_sign: int, large_step: bool = False) -> None:
+        """
+        Step a VALUE item up or down, clamp it to its bounds and schedule a settings save.
+
+        Args:
+            item: The selected menu item; anything but a VALUE item with a callback is ignored
+            delta_sign: 1 to increase, -1 to decrease
+            large_step: Change the value by ten steps (Shift held)
+        """
+        if item.type != MenuItemType.VALUE or not item.callback:
+            return
+        step = item.step or 1
+        if large_step:  # Shift held: change the value ten steps at a time
+            step *= 10
+
+        current_value = item.value()
+        new_value = current_value + delta_sign * step
+        # Both bounds apply in both directions; values never go below 0 when no min_value is set
+        new_value = max(new_value, item.min_value if item.min_value is not None else 0.0)
+        if item.max_value is not None:
+            new_value = min(new_value, item.max_value)
+
+        if isinstance(new_value, float):
+            new_value = round(new_value, 1)
+        if new_value == current_value:  # Already at a bound (e.g. a key held past max): nothing to set, save or redraw
+            return
+        item.callback(new_value)
+        self._dirty = True
+        if item.save_callback:
+            self._schedule_save(item.save_callback)
+
+    def _schedule_save(self, save_callback: Callable[[], None]) -> None:
+        """
+        Hands a settings save to the background writer thread and returns at once, so the menu
+        never waits on disk I/O. Holding an arrow key to scroll a value (or flipping several
+        toggles) writes .env once after the changes stop instead of on every step.
+
+        Args:
+            save_callback: The save_settings method of the settings object that changed.
+        """
+        if self.settings.save_immediately:  # SAVE_SETTINGS_IMMEDIATELY opts out of batching
+            save_callback()
+            return
+        self._save_queue.put(save_callback)
+
+    def _save_worker(self) -> None:
+        """
+        Background writer: waits for a save request, collects further requests until none arrive
+        for SAVE_DEBOUNCE_SECONDS, then calls each distinct save callback once. A None in the queue
+        flushes what is pending and stops the thread.
+        """
+        running = True
+        while running:
+            save_callback = self._save_queue.get()
+            if save_callback is None:
+                break
+            pending_saves = {save_callback}
+            while True:
+                try:
+                    save_callback = self._save_queue.get(timeout=SAVE_DEBOUNCE_SECONDS)
+                except queue.Empty:
+                    break
+                if save_callback is None:
+                    running = False
+                    break
+                pending_saves.add(save_callback)
+            for save_callback in pending_saves:
+                try:
+                    save_callback()
+                except Exception as e:
+                    logger.error(f"Error saving settings: {e}")
+
+    def _flush_pending_saves(self) -> None:
+        """Writes all queued settings saves and stops the writer thread. Called on exit."""
+        self._save_queue.put(None)
+        self._save_thread.join()
+
+    def _resolve_worker_count(self, files_count: int) -> int:
+        """
+        Returns the number of worker processes to start for a run.
+
+        Args:
+            files_count: Number of files that need AI analysis.
+
+        Returns:
+            int: The configured worker count, or the CPU count when set to auto,
+                 never more than the number of files.
+        """
+        num_workers = self.settings.worker_count or os.cpu_count() or 2
+        return max(1, min(num_workers, files_count))
+
+    def _start_workers(self, musicnn_settings: MusicnnSettings, num_workers: int):
         """Starts the worker processes."""
+        from music_tagger import worker_process  # Deferred: pulls in mutagen and the musicnn/TensorFlow stack
+        # Fresh queues: a worker that died mid-chunk leaves an unfinished task behind that join() would wait on forever
+        self.input_queue = multiprocessing.JoinableQueue()
+        self.output_queue = multiprocessing.Queue()
+        # Workers already run in parallel; give each its share of the cores, so TensorFlow
+        # doesn't start a full-size thread pool in every one of them
+        session_threads = max(1, (os.cpu_count() or 1) // num_workers)
         for _ in range(num_workers):
-            p = multiprocessing.Process(target=worker_process, args=(self.input_queue, self.output_queue, musicnn_settings))
+            # Daemonic, so idle workers kept between runs never block interpreter exit (e.g. on Ctrl+C)
+            p = multiprocessing.Process(target=worker_process, args=(self.input_queue, self.output_queue, musicnn_settings, session_threads), daemon=True)
             p.start()
             self.processes.append(p)
 
-    def _stop_workers(self):
-        """Signals worker processes to terminate and waits for them."""
+    def _drain_results(self, expected_files: Set[str], results_by_path: Dict[str, Dict[str, float]],
+                       ready_files: queue.Queue, ai_settings_key: Any, stop_draining: threading.Event) -> None:
+        """
+        Runs in a thread during a run: moves worker results from the output queue into results_by_path
+        and queues each file on ready_files as its result arrives, until every expected result arrived
+        or stop_draining is set. Each file's Last.fm lookup is queued at the same time, so the lookups
+        follow the order the files will be prompted for.
+        """
+        remaining = len(expected_files)
+        while remaining and not stop_draining.is_set():
+            try:
+                file_path, ai_genres_dict = self.output_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            with self._results_lock:
+                results_by_path[file_path] = ai_genres_dict
+                if self.settings.ai_cache_enabled:
+                    self.ai_results_cache.put(file_path, ai_settings_key, ai_genres_dict)
+            logger.debug(f"Received AI results for: {file_path}")
+            if file_path in expected_files:
+                self.music_tagger.prefetch_lastfm_tags([file_path], self.lastfm_settings)
+                ready_files.put(file_path)
+                remaining -= 1
+
+    def _ensure_workers(self, musicnn_settings: MusicnnSettings, num_workers: int) -> None:
+        """
+        Makes sure a pool of at least num_workers processes is running with the current settings.
+        Workers are kept alive between runs so TensorFlow and the models are loaded only once;
+        the pool is restarted only if the Musicnn settings changed, it is too small, or a worker died.
+        """
+        settings_key = AIResultsCache.settings_key(musicnn_settings)
+        if (self.processes and settings_key == self._workers_settings_key
+                and len(self.processes) >= num_workers and all(p.is_alive() for p in self.processes)):
+            return
+        self._stop_workers()
+        self._start_workers(musicnn_settings, num_workers)
+        self._workers_settings_key = settings_key
+
+    def _request_workers_stop(self) -> None:
+        """Sends every worker a termination signal without waiting for it."""
         for _ in self.processes:
             self.input_queue.put(None)  # Send termination signal
+
+    def _stop_workers(self, signal_sent: bool = False) -> None:
+        """
+        Signals worker processes to terminate and waits for them. All workers share one deadline;
+        any still running when it passes (e.g. busy on a long file) is terminated, then killed.
+
+        Args:
+            signal_sent: The termination signals were already sent with _request_workers_stop().
+        """
+        if not signal_sent:
+            self._request_workers_stop()
+        deadline = time.monotonic() + WORKER_STOP_TIMEOUT_SECONDS
         for p in self.processes:
-            p.join()  # Wait for processes to finish
+            p.join(max(0.0, deadline - time.monotonic()))  # Wait for processes to finish
+        survivors = [p for p in self.processes if p.is_alive()]
+        for p in survivors:
+            p.terminate()
+        for p in survivors:
+            p.join(1.0)
+            if p.is_alive():
+                p.kill()
+                p.join()
         self.processes = []
+        self._workers_settings_key = None
 
     def _process_music_directory(self) -> bool:
         """
@@ -535,10 +809,10 @@ class InteractiveMenu:
                 logger.info("Music directory selection cancelled. Processing aborted.")
                 return True  # Back to menu
 
-        if not os.path.isdir(music_directory):
+        if self._stat_directory(music_directory) is None:
             logger.error(f"Invalid music directory: {music_directory}")
             self.settings.default_music_dir = None  # Reset invalid directory
-            self.settings.save_settings()  # Save settings to remove invalid path
+            self._schedule_save(self.settings.save_settings)  # Save settings to remove invalid path
 
             logger.info("Default music directory setting has been reset.")
             return True  # Back to menu
@@ -548,42 +822,120 @@ class InteractiveMenu:
         print(f"\nStarting music genre tagging process for directory: {music_directory}...")
         print("AI genre analysis is running in the background for all music files. This may take a while.")  # Informative message
 
-        music_files = self.music_tagger.find_music_files(music_directory)
-        print(f"🔎 Found {len(music_files)} supported music files in {music_directory}")
+        scanned_files = self.music_tagger.scan_music_files(music_directory)  # Paths with their stat results
+        print(f"🔎 Found {len(scanned_files)} supported music files in {music_directory}")
+        if self.settings.skip_tagged_files:
+            # Checked before anything is queued, so tagged files cost one tag read instead of an AI analysis
+            tagged_count = len(scanned_files)
+            scanned_files = [music_file for music_file in scanned_files
+                             if not self.music_tagger.has_genre_tag(music_file.path, music_file.ext)]
+            tagged_count -= len(scanned_files)
+            if tagged_count:
+                print(f"Skipping {tagged_count} files that already have a genre tag")
+        music_files = [music_file.path for music_file in scanned_files]
 
         enabled_models_list = [model_name for model_name, is_enabled in self.musicnn_settings.enabled_models.items() if is_enabled]
         print(f"Using {len(enabled_models_list)} AI models: {C_AI}{', '.join(enabled_models_list)}{C_RESET}") # Print model count and list
 
-        # Start worker processes
-        self._start_workers(self.musicnn_settings)
-
-        # Populate the input queue
-        for file_path in music_files:
-            self.input_queue.put(file_path)
-
-        processed_count = 0
-        while processed_count < len(music_files):
-            # Check for results from workers, without blocking
-            while not self.output_queue.empty():
-                try:
-                    file_path, ai_genres_dict = self.output_queue.get_nowait()
-                    self.music_tagger.ai_genre_suggestions_cache[file_path] = ai_genres_dict
-                    logger.debug(f"Cached AI results for: {file_path}")
-                except queue.Empty:
-                    break # No more messages in the queue at the moment.
-
-            current_file = music_files[processed_count]
-
-            if current_file in self.music_tagger.ai_genre_suggestions_cache:
-                # Process the file (cached results are available!)
-                self.music_tagger.process_music_file(current_file, self.settings.auto_apply_tags, self.musicnn_settings, self.lastfm_settings)
-                processed_count += 1
-            else:
-                # Removed loading animation, wait directly for result.
-                time.sleep(0.2)  # Brief pause before checking again
-
-        # Stop worker processes
-        self._stop_workers()
+        # Results arrive out of order; keep them until their file comes up for interactive processing
+        results_by_path: Dict[str, Dict[str, float]] = {}
+        ai_settings_key = AIResultsCache.settings_key(self.musicnn_settings)
+        files_to_analyze = music_files
+        if self.settings.ai_cache_enabled:
+            # Unchanged files analyzed with the same settings on an earlier run cost nothing more:
+            # their stat was taken while scanning
+            for music_file in scanned_files:
+                cached_genres = self.ai_results_cache.get(music_file.path, ai_settings_key, music_file.stat)
+                if cached_genres is not None:
+                    results_by_path[music_file.path] = cached_genres
+            files_to_analyze = [file_path for file_path in music_files if file_path not in results_by_path]
+            if results_by_path:
+                print(f"Reusing cached AI results for {len(results_by_path)} unchanged files")
+
+        if files_to_analyze:
+            # Start worker processes, or reuse the ones still running from the previous run
+            self._ensure_workers(self.musicnn_settings, self._resolve_worker_count(len(files_to_analyze)))
+
+            # Populate the input queue in chunks to amortize queue operations; chunks stay small
+            # so the workers remain balanced and results keep arriving roughly in file order
+            chunk_size = max(1, min(MAX_CHUNK_SIZE, len(files_to_analyze) // (len(self.processes) * 4)))
+            for start in range(0, len(files_to_analyze), chunk_size):
+                self.input_queue.put(files_to_analyze[start:start + chunk_size])
+
+        # Files are prompted for in the order their AI results become available, not in scan order:
+        # cached ones right away, then the others as the workers finish them
+        cached_files = list(results_by_path)
+        ready_files: queue.Queue = queue.Queue()
+        for file_path in cached_files:
+            ready_files.put(file_path)
+
+        # A drainer thread collects worker results while this thread is busy with tag I/O and prompts,
+        # so the output queue never backs up
+        stop_draining = threading.Event()
+        drain_thread = threading.Thread(
+            target=self._drain_results,
+            args=(set(files_to_analyze), results_by_path, ready_files, ai_settings_key, stop_draining),
+            daemon=True
+        )
+        # Last.fm lookups run a few files ahead of the prompts, on the tagger's thread pool: the cached
+        # files now, the others as the drainer queues them
+        self.music_tagger.prefetch_lastfm_tags(cached_files, lastfm_settings)
+        if files_to_analyze:
+            drain_thread.start()
+
+        done_files = set()
+        waiting_shown = False
+        worker_lost = False
+        while len(done_files) < len(music_files):
+            try:
+                current_file = ready_files.get(timeout=1.0)
+            except queue.Empty:
+                print(f"\rWaiting for AI results... {len(done_files)}/{len(music_files)} files done", end='', flush=True)
+                waiting_shown = True
+                if not worker_lost and any(p.exitcode is not None for p in self.processes):
+                    # The files of a dead worker's chunk never get a result, and the other workers stay
+                    # alive idling on the input queue: stop waiting. Files whose result still arrives
+                    # before they come up are tagged with it, the rest without AI suggestions
+                    worker_lost = True
+                    print()
+                    waiting_shown = False
+                    logger.error("A worker process exited before every AI result arrived.")
+                    outstanding_files = [file_path for file_path in music_files if file_path not in done_files]
+                    self.music_tagger.prefetch_lastfm_tags(outstanding_files, lastfm_settings)
+                    for file_path in outstanding_files:
+                        ready_files.put(file_path)
+                    self._workers_settings_key = None  # Restart the pool on the next run
+                continue
+            if waiting_shown:
+                print()  # End the progress line
+                waiting_shown = False
+            if current_file in done_files:
+                continue
+            done_files.add(current_file)
+
+            with self._results_lock:
+                self.music_tagger.ai_genre_suggestions_cache[current_file] = results_by_path.pop(current_file, {})
+            logger.debug(f"Cached AI results for: {current_file}")
+            # Process the file (cached results are available!)
+            processed = self.music_tagger.process_music_file(current_file, self.settings.auto_apply_tags, self.musicnn_settings, self.lastfm_settings)
+            if processed and self.settings.ai_cache_enabled:
+                with self._results_lock:
+                    self.ai_results_cache.refresh(current_file)  # Writing the genre tag changed mtime and size
+
+        stop_draining.set()
+        if drain_thread.is_alive():
+            drain_thread.join()
+        self.music_tagger.cancel_lastfm_prefetch()
+
+        # Every file has its result at this point; wait until the workers have marked their last
+        # chunk done, so they are idle on the input queue. They are kept alive for the next run
+        # and stopped in _exit_program
+        if files_to_analyze and all(p.is_alive() for p in self.processes):
+            self.input_queue.join()
+        if self.settings.ai_cache_enabled:
+            self.ai_results_cache.save()
+        self._music_files_count_cache.clear()  # Library may have changed during the run
+        self._refresh_music_files_count()
 
         print(f"\nMusic genre tagging process completed for directory: {music_directory}")
         logger.info(f"Music genre tagging process completed for directory: {music_directory}")
@@ -604,58 +956,22 @@ class InteractiveMenu:
             bool: True if folder selection successful or cancelled, False on critical error
         """
         logger.debug("Entering _select_folder")  # Debug log at start
-        directory = None  # Initialize directory to None
         try:  # Add try-except block to catch potential Tkinter errors
-            if platform.system() == "Windows":
-                logger.debug("Platform is Windows, attempting GUI folder selection")
-                try:
-                    import tkinter as tk
-                    from tkinter import filedialog
-
-                    root = tk.Tk()
-                    root.withdraw()  # Hide the main window
-                    root.attributes('-topmost', True)  # Ensure dialog is on top
-
-                    initial_dir = (self.settings.default_music_dir
-                                   or os.path.expanduser("~/Music")
-                                   or os.path.expanduser("~"))
-
-                    logger.debug(f"Initial directory for dialog: {initial_dir}")
-                    directory = filedialog.askdirectory(
-                        title="Select Music Directory",
-                        initialdir=initial_dir,
-                        mustexist=True
-                    )
-                    logger.debug(f"Folder dialog returned: {directory}")
-
-                    root.destroy()
-                    logger.debug("Tkinter root destroyed")
-
-                    if not directory:  # User cancelled selection
-                        logger.info("Folder selection cancelled by user")
-                        return True
-
-                except ImportError:
-                    logger.warning("GUI dialog not available, falling back to console input")
-                    directory = self._get_console_input()
-                except Exception as e:
-                    logger.error(f"Error in GUI folder selection: {e}")
-                    directory = self._get_console_input()
-            else:
-                logger.debug("Platform is not Windows, using console input for folder selection")
-                directory = self._get_console_input()
+            directory = self._pick_folder()
 
             if not directory:
                 logger.info("No directory selected")
                 return True
 
-            if not os.path.isdir(directory):
+            dir_stat = self._stat_directory(directory)
+            if dir_stat is None:
                 logger.error(f"Invalid directory path: {directory}")
                 return True
 
             # Update settings with new directory and save
             self.settings.default_music_dir = directory
-            self.settings.save_settings()  # Save AppSettings to .env
+            self._schedule_save(self.settings.save_settings)  # Save AppSettings to .env
+            self._refresh_music_files_count(dir_stat)
 
             logger.info(f"Selected music directory: {directory}")
             logger.debug("Exiting _select_folder successfully")  # Debug log at end
@@ -665,6 +981,86 @@ class InteractiveMenu:
             logger.error(f"Critical error in folder selection: {e}")
             logger.debug("Exiting _select_folder with error")  # Debug log at error exit
             return True
+        finally:
+            self._prefetched_scan = None  # A prefetch is only valid for the selection that started it
+
+    def _dialog_initial_dir(self) -> str:
+        """Returns the folder a folder dialog opens in: the current music folder, else ~/Music."""
+        return (self.settings.default_music_dir
+                or os.path.expanduser("~/Music")
+                or os.path.expanduser("~"))
+
+    def _get_native_dialog_input(self) -> Optional[str]:
+        """
+        Get directory path through the native Windows folder dialog, which opens without loading Tcl/Tk.
+        Falls back to the Tkinter dialog (permanently) if the native one cannot be shown.
+
+        Returns:
+            Optional[str]: Selected directory path or None if cancelled
+        """
+        logger.debug("Attempting native folder selection")
+        initial_dir = self._dialog_initial_dir()
+        logger.debug(f"Initial directory for dialog: {initial_dir}")
+        # Users usually pick the current folder or one inside it: scan it while the dialog is open
+        self._start_prefetch_scan(initial_dir)
+        try:
+            from folder_dialog import browse_for_folder  # Deferred: Windows-only ctypes bindings
+            directory = browse_for_folder("Select Music Directory", initial_dir)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"Native folder dialog not available ({e}), falling back to Tkinter")
+            self._pick_folder = self._get_dialog_input  # Don't retry the native dialog on later selections
+            return self._get_dialog_input()
+        logger.debug(f"Folder dialog returned: {directory}")
+
+        if not directory:  # User cancelled selection
+            logger.info("Folder selection cancelled by user")
+            return None
+        return directory
+
+    def _get_dialog_input(self) -> Optional[str]:
+        """
+        Get directory path through a Tkinter folder dialog.
+
+        The hidden Tk root is created on first use and kept for later selections.
+        Falls back to console input if Tkinter is unavailable (permanently) or the dialog fails.
+
+        Returns:
+            Optional[str]: Selected directory path or None if cancelled
+        """
+        logger.debug("Attempting GUI folder selection")
+        try:
+            from tkinter import filedialog
+            if self._tk_root is None:
+                import tkinter as tk
+                self._tk_root = tk.Tk()
+                self._tk_root.withdraw()  # Hide the main window
+                self._tk_root.attributes('-topmost', True)  # Ensure dialog is on top
+
+            initial_dir = self._dialog_initial_dir()
+            logger.debug(f"Initial directory for dialog: {initial_dir}")
+            # Users usually pick the current folder or one inside it: scan it while the dialog is open
+            if self._prefetched_scan is None:
+                self._start_prefetch_scan(initial_dir)
+            directory = filedialog.askdirectory(
+                parent=self._tk_root,
+                title="Select Music Directory",
+                initialdir=initial_dir,
+                mustexist=True
+            )
+            logger.debug(f"Folder dialog returned: {directory}")
+
+            if not directory:  # User cancelled selection
+                logger.info("Folder selection cancelled by user")
+                return None
+            return directory
+
+        except ImportError:
+            logger.warning("GUI dialog not available, falling back to console input")
+            self._pick_folder = self._get_console_input  # Don't retry the import on later selections
+            return self._get_console_input()
+        except Exception as e:
+            logger.error(f"Error in GUI folder selection: {e}")
+            return self._get_console_input()
 
     def _get_console_input(self) -> Optional[str]:
         """
@@ -708,57 +1104,70 @@ class InteractiveMenu:
     def run(self) -> None:
         """Run the interactive menu system."""
         running = True
-        while running:
-            self._draw_menu()
-            running = self._handle_input()
+        with key_mode():  # Stay in key-by-key input for the whole session, not per key press
+            while running:
+                if self._dirty:
+                    self._draw_menu()
+                    self._dirty = False
+                running = self._handle_input()
 
     # Callback methods - Updated to use separate settings classes
     def _toggle_musiccn_enabled(self) -> None:
         self.musicnn_settings.enabled = not self.musicnn_settings.enabled  # Use musicnn_settings
-        self.musicnn_settings.save_settings()  # Save Musicnn settings
+        self._schedule_save(self.musicnn_settings.save_settings)  # Save Musicnn settings
+
+    def _is_musiccn_model_enabled(self, model_name: str) -> bool:
+        return self.musicnn_settings.enabled_models.get(model_name, False)
 
     def _toggle_musiccn_model_enabled(self, model_name: str) -> None:
         if model_name in self.musicnn_settings.enabled_models:
             current_state = self.musicnn_settings.enabled_models[model_name]
             self.musicnn_settings.enabled_models[model_name] = not current_state
-            self.musicnn_settings.save_settings() # Ensure settings are saved
+            self._schedule_save(self.musicnn_settings.save_settings) # Ensure settings are saved
         else:
             logger.warning(f"Model name '{model_name}' not found in musicnn settings.")
 
     def _set_musiccn_threshold_weight(self, value: float) -> None:
-        self.musicnn_settings.threshold_weight = value  # Use musicnn_settings
-        self.musicnn_settings.save_settings()  # Save Musicnn settings
+        self.musicnn_settings.threshold_weight = value  # Use musicnn_settings, saved by the debounced handler
 
     def _set_musiccn_genres_count(self, value: int) -> None:  # New callback for genres count
-        self.musicnn_settings.genres_count = int(value)  # Use musicnn_settings
-        self.musicnn_settings.save_settings()  # Save Musicnn settingss
+        self.musicnn_settings.genres_count = int(value)  # Use musicnn_settings, saved by the debounced handler
 
     def _toggle_lastfm_enabled(self) -> None:
         self.lastfm_settings.enabled = not self.lastfm_settings.enabled  # Use lastfm_settings
-        self.lastfm_settings.save_settings()  # Save LastFM settings
+        self._schedule_save(self.lastfm_settings.save_settings)  # Save LastFM settings
 
     def _set_lastfm_threshold_weight(self, value: float) -> None:
-        self.lastfm_settings.threshold_weight = value  # Use lastfm_settings
-        self.lastfm_settings.save_settings()  # Save LastFM settings
+        self.lastfm_settings.threshold_weight = value  # Use lastfm_settings, saved by the debounced handler
+
+    def _set_worker_count(self, value: int) -> None:
+        self.settings.worker_count = int(value)  # Saved by the debounced handler
 
     def _toggle_auto_apply(self) -> None:
         self.settings.auto_apply_tags = not self.settings.auto_apply_tags
-        self.settings.save_settings()  # Save AppSettings
+        self._schedule_save(self.settings.save_settings)  # Save AppSettings
+
+    def _toggle_skip_tagged_files(self) -> None:
+        self.settings.skip_tagged_files = not self.settings.skip_tagged_files
+        self._schedule_save(self.settings.save_settings)
 
     def _exit_program(self) -> bool:
         """Exit the program with proper cleanup."""
         logger.info("Exiting program")
-        self._stop_workers() # Terminate worker processes on exit
+        self._request_workers_stop()  # Workers wind down while the settings below are written
+        self._flush_pending_saves()  # Persist settings changes still waiting in the writer queue
+        self._stop_workers(signal_sent=True) # Terminate worker processes on exit
+        if self._tk_root is not None:
+            self._tk_root.destroy()
+            self._tk_root = None
         return False
 
 # Update the MusicTaggerMenu class to use the new interactive menu
 class MusicTaggerMenu:
     def __init__(self, music_tagger: 'MusicTagger'):
         self.music_tagger = music_tagger
-        self.app_settings = AppSettings()  # Load AppSettings from .env
-        self.musicnn_settings = MusicnnSettings()  # Load MusicnnSettings from .env
-        self.lastfm_settings = LastFMSettings()  # Load LastFMSettings from .env
-        self.menu = InteractiveMenu(self.app_settings, self.musicnn_settings, self.lastfm_settings,
+        # Shared settings instances; the menu owns them from here on (the Last.fm client uses the same one)
+        self.menu = InteractiveMenu(get_app_settings(), get_musicnn_settings(), get_lastfm_settings(),
                                     self.music_tagger)  # Pass all settings instances to menu
 
     def display_menu(self) -> None:
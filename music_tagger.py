@@ -1,7 +1,10 @@
 #!filepath: music_tagger.py
+import _bootstrap  # Must come first: sets TensorFlow environment variables before any TF import
 import os
 import logging
-from typing import List, Callable, Optional, Union, Tuple, Dict
+import threading
+from collections import OrderedDict
+from typing import List, Callable, NamedTuple, Optional, Union, Tuple, Dict
 
 import mutagen
 from mutagen.mp3 import MP3
@@ -21,14 +24,21 @@ from mutagen.wavpack import WavPack
 # Import necessary modules for handling TextFrame in WAV files
 from mutagen.id3 import ID3, TCON, TextFrame, Encoding
 
-from musicnn_tagger import get_musicnn_tags
+try:
+    # Optional Rust tag reader (Python 3.8+), used to read metadata of the formats it supports.
+    # Tags are always written with mutagen.
+    import mutagen_rs
+except ImportError:
+    mutagen_rs = None
+
 from lastfm_tagger import get_lastfm_tags
+from ai_results_cache import AIResultsCache
 
-import colorama
+# colorama.init() is left to main.py (also imported by the standalone run below), so worker
+# processes importing this module don't wrap stdout/stderr
 from colorama import Fore, Back, Style
 import multiprocessing
-
-colorama.init()
+import concurrent.futures
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -41,36 +51,103 @@ C_GENRE_SUGGESTION = Fore.GREEN
 C_RESET = Style.RESET_ALL
 C_BOLD = Style.BRIGHT
 
+# Threads looking up Last.fm tags ahead of the file being prompted for
+LASTFM_PREFETCH_WORKERS = 8
+# Artist/track separators tried on filenames, in priority order
+_FILENAME_SEPARATORS = (' - ', '-', '—', '_')
+# Upcoming files whose Last.fm lookup may be started; bounds the burst of requests sent to Last.fm
+LASTFM_PREFETCH_AHEAD = 16
+# A file opened with a SUPPORTED_FORMATS module: a FileType, or tags only (EasyID3, APEv2)
+_AudioFile = Union[mutagen.FileType, mutagen.Tags]
+
 
 def colored_print(color: str, text: str) -> None:
     """Prints text in the specified color."""
     print(color + text + C_RESET)
 
-def worker_process(input_queue: multiprocessing.Queue, output_queue: multiprocessing.Queue, musicnn_settings: 'musicnn_tagger.config.MusicnnSettings'):
+def analyze_music_file(file_path: str, musicnn_settings: 'musicnn_tagger.config.MusicnnSettings', audio_rep=None) -> Dict[str, float]:
     """
-    This function runs in a separate process.  It takes file paths from
-    the input queue, processes them using get_musicnn_tags, and puts the
-    results (file_path, genre_dict) into the output queue.
+    Runs the enabled Musicnn models on one file and returns its AI genres with their weights.
+    audio_rep is the file's already computed spectrogram, if any (see worker_process).
+    Errors are logged and yield an empty dict, so callers waiting on a result never hang.
     """
-    while True:
-        file_path = input_queue.get()
-        if file_path is None:  # Termination signal
-            break  # Exit the loop
+    # Deferred: loads TensorFlow, which only the processes doing the analysis need
+    from musicnn_tagger import get_musicnn_tags
+    try:
+        ai_genres_dict = get_musicnn_tags(
+            music_path=file_path,
+            ai_genres_count=musicnn_settings.genres_count,
+            max_genres_return_count=5,
+            min_weight=musicnn_settings.threshold_weight,
+            enabled_models_config=musicnn_settings.enabled_models, # Pass enabled models config
+            audio_rep=audio_rep
+        )
+        # Convert numpy float32 weights to plain floats: numpy scalars pickle into a much
+        # larger payload (dtype + reduce call per value) on every queue put
+        return {genre: float(weight) for genre, weight in ai_genres_dict.items()}
+    except Exception as e:
+        logger.error(f"AI analysis error processing {file_path}: {e}")
+        return {}
+
+def preload_models(musicnn_settings: 'musicnn_tagger.config.MusicnnSettings') -> None:
+    """Loads TensorFlow and the enabled Musicnn models into this process ahead of the first file."""
+    from musicnn_tagger import load_model
+    for model_name, is_enabled in musicnn_settings.enabled_models.items():
+        if is_enabled:
+            try:
+                load_model(model_name)
+            except Exception as e:  # Reported again, with any fallback, when a file is analyzed
+                logger.warning(f"Could not preload AI model {model_name}: {e}")
 
-        try:
-            ai_genres_dict = get_musicnn_tags(
-                music_path=file_path,
-                ai_genres_count=musicnn_settings.genres_count,
-                max_genres_return_count=5,
-                min_weight=musicnn_settings.threshold_weight,
-                enabled_models_config=musicnn_settings.enabled_models # Pass enabled models config
-            )
-            output_queue.put((file_path, ai_genres_dict))  # Send results back
-        except Exception as e:
-            logger.error(f"Worker process error processing {file_path}: {e}")
-            #  Send an error message. Put something in the output queue,
-            #  or the main process might hang waiting for results.
-            output_queue.put((file_path, {})) # Put empty result in queue.
+def worker_process(input_queue: multiprocessing.JoinableQueue, output_queue: multiprocessing.Queue, musicnn_settings: 'musicnn_tagger.config.MusicnnSettings',
+                   session_threads: int = 0):
+    """
+    This function runs in a separate process.  It takes chunks (lists) of file paths
+    from the input queue, processes each file using analyze_music_file, and puts the
+    results (file_path, genre_dict) into the output queue one file at a time.
+    Each chunk is marked with task_done() once all of its results are queued.
+    The enabled models are loaded once at startup and reused for every file, and the next
+    file of a chunk is decoded on a second thread while the models run on the current one.
+    session_threads caps TensorFlow's thread pools in this worker (0: one thread per core).
+    """
+    if session_threads:
+        # Same cap for the BLAS/OpenMP pools numpy and librosa start on import (just below);
+        # values set in the environment take precedence
+        for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+            os.environ.setdefault(variable, str(session_threads))
+    from musicnn_tagger import compute_audio_rep, set_session_threads
+    set_session_threads(session_threads)
+    preload_models(musicnn_settings)
+    # With every model disabled there is nothing to decode for; get_musicnn_tags returns no genres
+    decode = compute_audio_rep if any(musicnn_settings.enabled_models.values()) else lambda file_path: None
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='decode') as decoder:
+        while True:
+            file_paths = input_queue.get()
+            if file_paths is None:  # Termination signal
+                input_queue.task_done()
+                break  # Exit the loop
+
+            next_audio = decoder.submit(decode, file_paths[0])
+            for index, file_path in enumerate(file_paths):
+                audio_future = next_audio
+                if index + 1 < len(file_paths):
+                    next_audio = decoder.submit(decode, file_paths[index + 1])  # Overlaps this file's inference
+                try:
+                    audio_rep = audio_future.result()
+                except Exception as e:
+                    logger.error(f"AI analysis error processing {file_path}: {e}")
+                    ai_genres_dict = {}
+                else:
+                    ai_genres_dict = analyze_music_file(file_path, musicnn_settings, audio_rep)
+                # Errors come back as an empty result: the main process waits for one result per file
+                output_queue.put((file_path, ai_genres_dict))  # Send results back
+            input_queue.task_done()
+
+class MusicFile(NamedTuple):
+    """A music file found by MusicTagger.scan_music_files."""
+    path: str
+    ext: str  # Lowercase extension, a key of MusicTagger.SUPPORTED_FORMATS
+    stat: Optional[os.stat_result]  # Taken while scanning; None if the file could not be stat'ed
 
 class MusicTagger:
     """
@@ -78,35 +155,57 @@ class MusicTagger:
     and supporting a wide range of audio file formats.
     """
 
-    SUPPORTED_FORMATS: Dict[str, Dict[str, Union[Callable, List[str]]]] = {
-        '.mp3': {'module': EasyID3, 'alt_module': MP3, 'genre_tag': ['genre'], 'artist_tags': ['artist', 'ARTIST', 'TPE1', 'TPE2', 'TOPE'], 'title_tags': ['title', 'TITLE', 'TIT2']},
-        '.m4a': {'module': MP4, 'genre_tag': ['\xa9gen'], 'artist_tags': ['\xa9ART', 'aART', 'ART', '\xa9albArtist', '©ART'], 'title_tags': ['\xa9nam', '\xa9Title', 'TITLE', '\xa9title']},
-        '.flac': {'module': FLAC, 'genre_tag': ['GENRE'], 'artist_tags': ['artist', 'ARTIST'], 'title_tags': ['title', 'TITLE']},
-        '.ogg': {'module': OggVorbis, 'genre_tag': ['genre'], 'artist_tags': ['artist', 'ARTIST'], 'title_tags': ['title', 'TITLE']}, # OggVorbis for .ogg, more specific types like opus, flac, speex handled below
-        '.opus': {'module': OggOpus, 'genre_tag': ['genre'], 'artist_tags': ['artist', 'ARTIST'], 'title_tags': ['title', 'TITLE']},
-        '.oga': {'module': OggFLAC, 'genre_tag': ['genre'], 'artist_tags': ['artist', 'ARTIST'], 'title_tags': ['title', 'TITLE']}, # .oga is often Ogg FLAC
-        '.spx': {'module': OggSpeex, 'genre_tag': ['genre'], 'artist_tags': ['artist', 'ARTIST'], 'title_tags': ['title', 'TITLE']},
-        '.wav': {'module': WAVE, 'genre_tag': ['genre'], 'artist_tags': ['artist', 'ARTIST'], 'title_tags': ['title', 'TITLE']}, # WAVE might need special handling for genres - check mutagen docs if needed
-        '.aiff': {'module': AIFF, 'genre_tag': ['genre'], 'artist_tags': ['artist', 'ARTIST'], 'title_tags': ['title', 'TITLE']}, # AIFF genre support might be limited
-        '.aif': {'module': AIFF, 'genre_tag': ['genre'], 'artist_tags': ['artist', 'ARTIST'], 'title_tags': ['title', 'TITLE']}, # AIFF genre support might be limited
-        '.asf': {'module': ASF, 'genre_tag': ['genre'], 'artist_tags': ['author', 'Author', 'ARTIST'], 'title_tags': ['title', 'Title', 'TITLE']}, # ASF/WMA/WMV
-        '.wma': {'module': ASF, 'genre_tag': ['genre'], 'artist_tags': ['author', 'Author', 'ARTIST'], 'title_tags': ['title', 'Title', 'TITLE']}, # WMA - using ASF module
-        '.wmv': {'module': ASF, 'genre_tag': ['genre'], 'artist_tags': ['author', 'Author', 'ARTIST'], 'title_tags': ['title', 'Title', 'TITLE']}, # WMV - using ASF module
-        '.ape': {'module': APEv2, 'genre_tag': ['Genre'], 'artist_tags': ['Artist'], 'title_tags': ['Title']},
-        '.wv': {'module': WavPack, 'genre_tag': ['genre'], 'artist_tags': ['artist', 'ARTIST'], 'title_tags': ['title', 'TITLE']}, # .wv for WavPack
+    SUPPORTED_FORMATS: Dict[str, Dict[str, Union[Callable, List[str], Tuple[str, ...]]]] = {
+        '.mp3': {'module': EasyID3, 'alt_module': MP3, 'genre_tag': ['genre'], 'artist_tags': ('artist', 'ARTIST', 'TPE1', 'TPE2', 'TOPE'), 'title_tags': ('title', 'TITLE', 'TIT2')},
+        '.m4a': {'module': MP4, 'genre_tag': ['\xa9gen'], 'artist_tags': ('\xa9ART', 'aART', 'ART', '\xa9albArtist', '©ART'), 'title_tags': ('\xa9nam', '\xa9Title', 'TITLE', '\xa9title')},
+        '.flac': {'module': FLAC, 'genre_tag': ['GENRE'], 'artist_tags': ('artist', 'ARTIST'), 'title_tags': ('title', 'TITLE')},
+        '.ogg': {'module': OggVorbis, 'genre_tag': ['genre'], 'artist_tags': ('artist', 'ARTIST'), 'title_tags': ('title', 'TITLE')}, # OggVorbis for .ogg, more specific types like opus, flac, speex handled below
+        '.opus': {'module': OggOpus, 'genre_tag': ['genre'], 'artist_tags': ('artist', 'ARTIST'), 'title_tags': ('title', 'TITLE')},
+        '.oga': {'module': OggFLAC, 'genre_tag': ['genre'], 'artist_tags': ('artist', 'ARTIST'), 'title_tags': ('title', 'TITLE')}, # .oga is often Ogg FLAC
+        '.spx': {'module': OggSpeex, 'genre_tag': ['genre'], 'artist_tags': ('artist', 'ARTIST'), 'title_tags': ('title', 'TITLE')},
+        '.wav': {'module': WAVE, 'genre_tag': ['genre'], 'artist_tags': ('artist', 'ARTIST'), 'title_tags': ('title', 'TITLE')}, # WAVE might need special handling for genres - check mutagen docs if needed
+        '.aiff': {'module': AIFF, 'genre_tag': ['genre'], 'artist_tags': ('artist', 'ARTIST'), 'title_tags': ('title', 'TITLE')}, # AIFF genre support might be limited
+        '.aif': {'module': AIFF, 'genre_tag': ['genre'], 'artist_tags': ('artist', 'ARTIST'), 'title_tags': ('title', 'TITLE')}, # AIFF genre support might be limited
+        '.asf': {'module': ASF, 'genre_tag': ['genre'], 'artist_tags': ('author', 'Author', 'ARTIST'), 'title_tags': ('title', 'Title', 'TITLE')}, # ASF/WMA/WMV
+        '.wma': {'module': ASF, 'genre_tag': ['genre'], 'artist_tags': ('author', 'Author', 'ARTIST'), 'title_tags': ('title', 'Title', 'TITLE')}, # WMA - using ASF module
+        '.wmv': {'module': ASF, 'genre_tag': ['genre'], 'artist_tags': ('author', 'Author', 'ARTIST'), 'title_tags': ('title', 'Title', 'TITLE')}, # WMV - using ASF module
+        '.ape': {'module': APEv2, 'genre_tag': ['Genre'], 'artist_tags': ('Artist',), 'title_tags': ('Title',)},
+        '.wv': {'module': WavPack, 'genre_tag': ['genre'], 'artist_tags': ('artist', 'ARTIST'), 'title_tags': ('title', 'TITLE')}, # .wv for WavPack
+    }
+    # Supported extensions as a frozenset for O(1) membership tests while scanning directories
+    SUPPORTED_EXTENSIONS = frozenset(SUPPORTED_FORMATS)
+    # mutagen_rs readers used instead of 'module' in _extract_metadata_from_file, when installed.
+    # Looked up with getattr: readers missing from the installed mutagen_rs version fall back to mutagen
+    FAST_READ_MODULES: Dict[str, Callable] = {
+        ext: reader for ext, reader in (
+            ('.mp3', getattr(mutagen_rs, 'EasyID3', None)),
+            ('.m4a', getattr(mutagen_rs, 'MP4', None)),
+            ('.flac', getattr(mutagen_rs, 'FLAC', None)),
+            ('.ogg', getattr(mutagen_rs, 'OggVorbis', None)),
+        ) if reader is not None
     }
 
     def __init__(self) -> None:
         """Initializes the MusicTagger and the AI genre suggestions cache."""
         self.ai_genre_suggestions_cache: Dict[str, Dict[str, float]] = {} # Cache for AI genre suggestions
-
-    def set_genre_tag(self, file_path: str, genres: Union[str, List[str]]) -> bool:
+        # file path -> future (artist, track, opened file, Last.fm tags), started by prefetch_lastfm_tags
+        self._lastfm_prefetch: Dict[str, concurrent.futures.Future] = {}
+        self._lastfm_upcoming: 'OrderedDict[str, float]' = OrderedDict()  # file path -> threshold weight, not started yet
+        self._lastfm_taken: set = set()  # Files already processed this run, never looked up again
+        self._lastfm_lock = threading.Lock()  # Lookups may be queued from another thread (main.py's result drainer)
+        self._lastfm_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None  # Created on first prefetch
+
+    def set_genre_tag(self, file_path: str, genres: Union[str, List[str]], ext: Optional[str] = None,
+                      audio: Optional[_AudioFile] = None) -> bool:
         """
         Sets the genre tag(s) for a music file, supporting various file formats.
 
         Args:
             file_path (str): Path to the music file.
             genres (Union[str, List[str]]): Genre or list of genres to set.
+            ext (Optional[str]): Lowercase extension of file_path, if the caller already has it.
+            audio (Optional[_AudioFile]): file_path already opened with its format's module, so its
+                tags are not parsed a second time. Not used for WAV files.
 
         Returns:
             bool: True if genre tag(s) were set successfully, False otherwise.
@@ -120,25 +219,13 @@ class MusicTagger:
                 logger.error(f"Invalid genre format: {genres}. Expected string or list.")
                 return False
 
-            ext = os.path.splitext(file_path)[1].lower()
+            if ext is None:
+                ext = os.path.splitext(file_path)[1].lower()
             if ext not in self.SUPPORTED_FORMATS:
                 logger.error(f"Unsupported file format for tagging: {file_path}")
                 return False
 
-            format_config = self.SUPPORTED_FORMATS[ext]
-            module = format_config['module']
-            genre_tag_keys = format_config['genre_tag']
-
-            try:
-                audio = module(file_path)
-            except mutagen.MutagenError as e: # Catch general mutagen errors, e.g., for MP3 files without header
-                if ext == '.mp3' and format_config.get('alt_module'): # Special handling for MP3 with missing header
-                    audio = format_config['alt_module'](file_path, ID3=EasyID3)
-                else:
-                    logger.error(f"Error opening file {file_path} with mutagen: {e}")
-                    return False
-
-            if ext == '.wav':
+            if ext == '.wav':  # WAV genres are written as an ID3 frame directly; no need to open the file as WAVE
                 try:
                     audio_id3 = ID3(file_path)
                 except mutagen.id3._util.ID3NoHeaderError:
@@ -150,7 +237,21 @@ class MusicTagger:
                 logger.info(f"Genre tag(s) set to '{genres}' for WAV file: {file_path}")
                 return True
 
-            elif isinstance(audio, EasyID3): #EasyID3 uses list for genre
+            format_config = self.SUPPORTED_FORMATS[ext]
+            module = format_config['module']
+            genre_tag_keys = format_config['genre_tag']
+
+            if audio is None:
+                try:
+                    audio = module(file_path)
+                except mutagen.MutagenError as e: # Catch general mutagen errors, e.g., for MP3 files without header
+                    if ext == '.mp3' and format_config.get('alt_module'): # Special handling for MP3 with missing header
+                        audio = format_config['alt_module'](file_path, ID3=EasyID3)
+                    else:
+                        logger.error(f"Error opening file {file_path} with mutagen: {e}")
+                        return False
+
+            if isinstance(audio, EasyID3): #EasyID3 uses list for genre
                 audio['genre'] = genre_list
             else: # Other formats might expect a single string or handle lists differently.
                 # Setting the first genre tag key with the list of genres.
@@ -165,6 +266,35 @@ class MusicTagger:
         except Exception as e:
             logger.error(f"Error processing genre tag for file {file_path}: {e}")
             return False
+    def has_genre_tag(self, file_path: str, ext: Optional[str] = None) -> bool:
+        """
+        Checks whether a music file already has a non-empty genre tag.
+
+        Args:
+            file_path (str): Path to the music file.
+            ext (Optional[str]): Lowercase extension of file_path, if the caller already has it.
+
+        Returns:
+            bool: True if a genre is set, False if not or if the tags could not be read.
+        """
+        if ext is None:
+            ext = os.path.splitext(file_path)[1].lower()
+        format_config = self.SUPPORTED_FORMATS.get(ext)
+        if format_config is None:
+            return False
+        genre_tag_key = 'TCON' if ext == '.wav' else format_config['genre_tag'][0]  # set_genre_tag writes WAV genres as ID3 TCON
+        module = self.FAST_READ_MODULES.get(ext)
+        if module is not None:
+            genre_tag_key = genre_tag_key.lower()  # mutagen_rs lowercases Vorbis comment keys ('GENRE')
+        else:
+            module = format_config['module']
+        try:
+            genre = module(file_path).get(genre_tag_key)
+        except Exception as e:  # e.g. an MP3 without an ID3 header
+            logger.debug(f"Could not read genre tag of {file_path}: {e}")
+            return False
+        return bool(getattr(genre, 'text', genre))  # ID3 frames keep their values in .text
+
     def _extract_artist_track_from_filename(self, filename: str) -> Tuple[str, str]:
         """
         Extracts artist and track name from filename using heuristics.
@@ -177,13 +307,13 @@ class MusicTagger:
         """
         track_name = filename
         artist_name = ""
-        separators = [' - ', '-', '—', '_']
 
-        for sep in separators:
-            if sep in filename:
-                parts = filename.split(sep, 1)
-                artist_name = parts[0].strip()
-                track_name = parts[1].strip()
+        # Separators in priority order, so e.g. ' - ' wins over an earlier '_'
+        for sep in _FILENAME_SEPARATORS:
+            artist_part, found, track_part = filename.partition(sep)  # One scan, instead of 'in' then split()
+            if found:
+                artist_name = artist_part.strip()
+                track_name = track_part.strip()
                 break
 
         track_name = os.path.splitext(track_name)[0]
@@ -196,9 +326,7 @@ class MusicTagger:
         """
         if not name:
             return ""
-        words = name.split()
-        unique_words = list(dict.fromkeys(words)) # Preserve order while removing duplicates
-        return " ".join(unique_words)
+        return " ".join(dict.fromkeys(name.split())) # Preserve order while removing duplicates
 
     def _remove_file_extension_from_track(self, track_name: str) -> str:
         """
@@ -208,40 +336,39 @@ class MusicTagger:
         base_track_name = os.path.splitext(track_name)[0]
         return base_track_name
 
-    def _extract_metadata_from_file(self, file_path: str) -> Tuple[str, str]:
+    def _extract_metadata_from_file(self, file_path: str, ext: Optional[str] = None) -> Tuple[str, str, Optional[_AudioFile]]:
         """
         Extracts artist and track name from music file metadata using mutagen.
         Includes deduplication of artist and track names and removes file extension from track name.
 
         Args:
             file_path (str): Path to the music file.
+            ext (Optional[str]): Lowercase extension of file_path, if the caller already has it.
 
         Returns:
-            Tuple[str, str]: Artist name and track name extracted from metadata, or empty strings if extraction fails.
+            Tuple[str, str, Optional[_AudioFile]]: Artist name and track name extracted from metadata,
+                or empty strings if extraction fails, and the opened file for set_genre_tag to write to
+                (None if it was read with a read-only mutagen_rs reader or could not be opened).
         """
         artist_name = ""
         track_name = ""
-        ext = os.path.splitext(file_path)[1].lower()
+        if ext is None:
+            ext = os.path.splitext(file_path)[1].lower()
 
         if ext not in self.SUPPORTED_FORMATS:
             logger.debug(f"Unsupported format for metadata extraction: {file_path}")
-            return "", ""
+            return "", "", None
 
         format_config = self.SUPPORTED_FORMATS[ext]
-        module = format_config['module']
+        module = self.FAST_READ_MODULES.get(ext, format_config['module'])
         artist_tag_keys = format_config['artist_tags']
         title_tag_keys = format_config['title_tags']
 
         try:
             audio = module(file_path)
             # Removed debug log for tags
-            artist_list = []
-            for tag in artist_tag_keys:
-                artist_list.extend(audio.get(tag, []))
-
-            title_list = []
-            for tag in title_tag_keys:
-                title_list.extend(audio.get(tag, []))
+            artist_list = [value for tag in artist_tag_keys for value in audio.get(tag, ())]
+            title_list = [value for tag in title_tag_keys for value in audio.get(tag, ())]
 
             artist_name_list = [str(artist).strip() for artist in artist_list if artist]
             track_name_list = [str(title).strip() for title in title_list if title]
@@ -258,64 +385,98 @@ class MusicTagger:
 
         except Exception as e:
             logger.error(f"Error extracting metadata from {file_path}: {e}")
-            return "", ""
+            return "", "", None
 
-        return artist_name.strip(), track_name.strip()
-    def process_music_file(self, file_path: str, auto_apply_tags: bool, musicnn_settings: 'musicnn_tagger.config.MusicnnSettings', lastfm_settings: 'lastfm_tagger.config.Settings') -> bool:
+        return artist_name.strip(), track_name.strip(), audio if module is format_config['module'] else None
+    def _get_artist_track(self, file_path: str, ext: Optional[str] = None) -> Tuple[str, str, Optional[_AudioFile]]:
         """
-        Processes a single music file with AI and Last.fm genre suggestions, then sets the genre tag.
-        Retrieves AI genre suggestions from cache. No loading animation or print here.
-
-        Args:
-            file_path (str): Path to the music file.
-            auto_apply_tags (bool): If True, automatically apply suggested tags.
-            musicnn_settings (MusicnnSettings): Settings for Musicnn tagger.
-            lastfm_settings (LastFMSettings): Settings for LastFM tagger.
-
-        Returns:
-            bool: True if the file was processed (genre tag set or skipped), False if processing failed.
+        Returns the artist and track name from the file's metadata, falling back to its filename,
+        and the opened file (see _extract_metadata_from_file).
         """
-        suggested_genres_ai = []
-        suggested_genres_lastfm = []
-        ai_genres_dict_weighted = {} # To store AI genres with weights
-        lastfm_tags_weights_list = [] # To store LastFM genres with weights
-
-        # Retrieve AI genre suggestions from cache
-        if file_path in self.ai_genre_suggestions_cache:
-            logger.debug(f"Using cached AI genre suggestions for: {file_path}") # Debug log instead of info
-            ai_genres_dict = self.ai_genre_suggestions_cache[file_path]
-            suggested_genres_ai = list(ai_genres_dict.keys())
-            ai_genres_dict_weighted = ai_genres_dict # Get the dict with weights
-        else:
-            logger.error(f"AI genre suggestions not found in cache for: {file_path}. This should not happen if pre-fetching is enabled.")
-            ai_genres_dict = {} # Fallback to empty dict to avoid errors
-
-        filename = os.path.basename(file_path)
-        artist_name, track_name = self._extract_metadata_from_file(file_path)
-
+        artist_name, track_name, audio = self._extract_metadata_from_file(file_path, ext)
         if not artist_name or not track_name:
             logger.warning("Could not extract artist and track from metadata, falling back to filename parsing.")
-            artist_name, track_name = self._extract_artist_track_from_filename(filename)
-
-        logger.info(f"Extracted Artist Name: '{artist_name}', Track Name: '{track_name}' for Last.fm")
+            artist_name, track_name = self._extract_artist_track_from_filename(os.path.basename(file_path))
+        return artist_name, track_name, audio
 
-        if lastfm_settings.enabled: # Conditionally use lastfm tagger
-            lastfm_tags_weights = get_lastfm_tags(
-                artist_name,
-                track_name,
-                top_n=5, # Fixed value, not from settings
-                min_weight=lastfm_settings.threshold_weight * 100 # LastFM weight is percentage based
-            )
-            lastfm_tags_weights_list = [(tag_name, int(tag_weight)) for tag_name, tag_weight in lastfm_tags_weights] # Ensure weight is int
-            suggested_genres_lastfm = [tag_name for tag_name, _ in lastfm_tags_weights]
-        else:
-            lastfm_tags_weights_list = [] # Ensure it's empty if lastfm is disabled
+    @staticmethod
+    def _get_lastfm_tags(artist_name: str, track_name: str, threshold_weight: float,
+                         speculative_artist: bool = False) -> List[Tuple[str, int]]:
+        """
+        Returns the top Last.fm tags and their weights for a track. speculative_artist is only set for
+        inline lookups the user is waiting on; prefetched ones already overlap each other.
+        """
+        return get_lastfm_tags(
+            artist_name,
+            track_name,
+            top_n=5, # Fixed value, not from settings
+            min_weight=threshold_weight * 100, # LastFM weight is percentage based
+            speculative_artist=speculative_artist
+        )
+
+    def _lookup_lastfm(self, file_path: str, threshold_weight: float) -> Tuple[str, str, Optional[_AudioFile], List[Tuple[str, int]]]:
+        """Reads a file's artist and track name and looks up its Last.fm tags (runs on the prefetch threads)."""
+        artist_name, track_name, audio = self._get_artist_track(file_path)
+        return artist_name, track_name, audio, self._get_lastfm_tags(artist_name, track_name, threshold_weight)
+
+    def prefetch_lastfm_tags(self, file_paths: List[str], lastfm_settings: 'lastfm_tagger.config.Settings') -> None:
+        """
+        Starts the Last.fm lookups of the given files on a thread pool, so their HTTP round-trips
+        overlap each other and the prompts instead of running one by one in process_music_file.
+        Repeated artist/track pairs are answered from the Last.fm client's response cache.
 
-        suggested_genres_all = suggested_genres_ai + suggested_genres_lastfm
-        suggested_genres_all_unique = sorted(list(set(suggested_genres_all)), key=suggested_genres_all.index)
+        Can be called again during a run to append files as they become ready for processing.
 
+        Args:
+            file_paths (List[str]): Files about to be processed, in processing order.
+            lastfm_settings (LastFMSettings): Settings for LastFM tagger.
+        """
+        if not lastfm_settings.enabled:
+            return
+        with self._lastfm_lock:
+            if self._lastfm_executor is None:
+                self._lastfm_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=LASTFM_PREFETCH_WORKERS, thread_name_prefix='lastfm')
+            for file_path in file_paths:
+                if file_path not in self._lastfm_prefetch and file_path not in self._lastfm_taken:
+                    self._lastfm_upcoming.setdefault(file_path, lastfm_settings.threshold_weight)
+            self._start_lastfm_lookups()
+
+    def _start_lastfm_lookups(self) -> None:
+        """Starts upcoming Last.fm lookups until LASTFM_PREFETCH_AHEAD of them are pending. Called with _lastfm_lock held."""
+        while self._lastfm_upcoming and len(self._lastfm_prefetch) < LASTFM_PREFETCH_AHEAD:
+            file_path, threshold_weight = self._lastfm_upcoming.popitem(last=False)
+            self._lastfm_prefetch[file_path] = self._lastfm_executor.submit(self._lookup_lastfm, file_path, threshold_weight)
+
+    def _take_lastfm_prefetch(self, file_path: str) -> Optional[concurrent.futures.Future]:
+        """
+        Returns the prefetched Last.fm lookup of a file, or None if it was not started yet.
+        Either way the file is not looked up again this run (a file looked up inline is dropped
+        from the upcoming ones), and the look-ahead window is refilled with the next files.
+        """
+        with self._lastfm_lock:
+            self._lastfm_taken.add(file_path)
+            prefetched = self._lastfm_prefetch.pop(file_path, None)
+            if prefetched is None:
+                self._lastfm_upcoming.pop(file_path, None)
+            if self._lastfm_executor is not None:
+                self._start_lastfm_lookups()
+        return prefetched
+
+    def cancel_lastfm_prefetch(self) -> None:
+        """Cancels the Last.fm lookups of files that were not processed (e.g. an interrupted run)."""
+        with self._lastfm_lock:
+            for future in self._lastfm_prefetch.values():
+                future.cancel()
+            self._lastfm_prefetch.clear()
+            self._lastfm_upcoming.clear()
+            self._lastfm_taken.clear()
+
+    def _print_suggestions(self, suggested_genres_ai: List[str], ai_genres_dict_weighted: Dict[str, float],
+                           lastfm_tags_weights_list: List[Tuple[str, int]]) -> None:
+        """Prints the AI and Last.fm genre suggestions side by side, with their weights."""
         colored_print(C_AI, f"{C_BOLD}AI Suggested genres:{C_RESET}")
-        if suggested_genres_ai or suggested_genres_lastfm:
+        if suggested_genres_ai or lastfm_tags_weights_list:
             ai_genres_display = []
             lastfm_genres_display = []
 
@@ -362,6 +523,61 @@ class MusicTagger:
         else:
             colored_print(C_AI, "No genres suggested from AI or Last.fm.")
 
+    def process_music_file(self, file_path: str, auto_apply_tags: bool, musicnn_settings: 'musicnn_tagger.config.MusicnnSettings', lastfm_settings: 'lastfm_tagger.config.Settings') -> bool:
+        """
+        Processes a single music file with AI and Last.fm genre suggestions, then sets the genre tag.
+        Retrieves AI genre suggestions from cache. No loading animation or print here.
+
+        Args:
+            file_path (str): Path to the music file.
+            auto_apply_tags (bool): If True, automatically apply suggested tags.
+            musicnn_settings (MusicnnSettings): Settings for Musicnn tagger.
+            lastfm_settings (LastFMSettings): Settings for LastFM tagger.
+
+        Returns:
+            bool: True if the file was processed (genre tag set or skipped), False if processing failed.
+        """
+        suggested_genres_ai = []
+        suggested_genres_lastfm = []
+        ai_genres_dict_weighted = {} # To store AI genres with weights
+        lastfm_tags_weights_list = [] # To store LastFM genres with weights
+
+        # Retrieve AI genre suggestions from cache
+        if file_path in self.ai_genre_suggestions_cache:
+            logger.debug(f"Using cached AI genre suggestions for: {file_path}") # Debug log instead of info
+            ai_genres_dict = self.ai_genre_suggestions_cache[file_path]
+            suggested_genres_ai = list(ai_genres_dict.keys())
+            ai_genres_dict_weighted = ai_genres_dict # Get the dict with weights
+        else:
+            logger.error(f"AI genre suggestions not found in cache for: {file_path}. This should not happen if pre-fetching is enabled.")
+            ai_genres_dict = {} # Fallback to empty dict to avoid errors
+
+        filename = os.path.basename(file_path)
+        ext = os.path.splitext(filename)[1].lower()  # Shared by the metadata read and the tag write
+        prefetched = self._take_lastfm_prefetch(file_path)
+        if prefetched is not None and lastfm_settings.enabled:
+            # Looked up in the background while earlier files were prompted for
+            artist_name, track_name, audio, lastfm_tags_weights = prefetched.result()
+        else:
+            artist_name, track_name, audio = self._get_artist_track(file_path, ext)
+            if lastfm_settings.enabled: # Conditionally use lastfm tagger
+                lastfm_tags_weights = self._get_lastfm_tags(artist_name, track_name, lastfm_settings.threshold_weight,
+                                                            speculative_artist=True)
+
+        logger.info(f"Extracted Artist Name: '{artist_name}', Track Name: '{track_name}' for Last.fm")
+
+        if lastfm_settings.enabled:
+            lastfm_tags_weights_list = [(tag_name, int(tag_weight)) for tag_name, tag_weight in lastfm_tags_weights] # Ensure weight is int
+            suggested_genres_lastfm = [tag_name for tag_name, _ in lastfm_tags_weights]
+        else:
+            lastfm_tags_weights_list = [] # Ensure it's empty if lastfm is disabled
+
+        # AI genres first, then Last.fm ones, each once in first-seen order
+        suggested_genres_all_unique = list(dict.fromkeys(suggested_genres_ai + suggested_genres_lastfm))
+
+        if not auto_apply_tags:  # Auto-apply logs the genres it sets; the table is only for choosing
+            self._print_suggestions(suggested_genres_ai, ai_genres_dict_weighted, lastfm_tags_weights_list)
+
         while True:
             prompt_genres_list = suggested_genres_all_unique if suggested_genres_all_unique else ['no suggestions']
             prompt_genres_colored = f"{C_GENRE_SUGGESTION}{', '.join(prompt_genres_list)}{C_RESET}"
@@ -389,7 +605,64 @@ class MusicTagger:
                     return False # Indicate skipped, but not an error
 
         logger.info(f"Processing file: {file_path}, setting genre(s) to: {genres}")
-        return self.set_genre_tag(file_path, genres)
+        return self.set_genre_tag(file_path, genres, ext, audio)  # Writes to the file opened for the metadata read
+
+    @staticmethod
+    def _stat_entry(entry: os.DirEntry) -> Optional[os.stat_result]:
+        """Stats a directory entry (free on Windows, where the listing carries it); None on failure."""
+        try:
+            return entry.stat()
+        except OSError:  # e.g. a broken symlink
+            return None
+
+    def _scan_directory(self, directory: str, with_stats: bool) -> Tuple[List[Union[str, 'MusicFile']], List[str]]:
+        """
+        Lists one directory with os.scandir, whose entries carry the file type, so no extra stat
+        call is needed per entry.
+
+        Returns:
+            Tuple[List[Union[str, MusicFile]], List[str]]: Supported music files (paths, or MusicFile
+                tuples if with_stats) and sub-directories, in listing order. Unreadable directories
+                yield two empty lists, as os.walk skips them.
+        """
+        music_files: List[Union[str, MusicFile]] = []
+        sub_dirs: List[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():  # Like os.walk, don't descend into symlinked directories
+                            sub_dirs.append(entry.path)
+                        continue
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext in self.SUPPORTED_EXTENSIONS:
+                        music_files.append(MusicFile(entry.path, ext, self._stat_entry(entry)) if with_stats else entry.path)
+        except OSError as e:
+            logger.debug(f"Skipping directory {directory}: {e}")
+        return music_files, sub_dirs
+
+    def _walk_music_files(self, root_dir: str, with_stats: bool) -> List[Union[str, 'MusicFile']]:
+        """
+        Recursively collects the music files under root_dir. Directories are listed on a thread pool
+        as soon as they are discovered, so listing syscalls (slow on network drives) overlap.
+        Files are returned in the same top-down order as os.walk.
+        """
+        clear_mutagen_rs_caches = getattr(mutagen_rs, 'clear_all_caches', None)
+        if clear_mutagen_rs_caches is not None:
+            # mutagen_rs caches file data by path and doesn't see changes made with mutagen or
+            # other tools; start every scan (i.e. every run) from fresh reads
+            clear_mutagen_rs_caches()
+        music_files: List[Union[str, MusicFile]] = []
+        # Default worker count (CPU count + 4, at most 32) suits this I/O-bound work
+        with concurrent.futures.ThreadPoolExecutor(thread_name_prefix='scan') as executor:
+            # Stack of pending listings; the top is always the next directory in os.walk order
+            pending_scans = [executor.submit(self._scan_directory, root_dir, with_stats)]
+            while pending_scans:
+                files, sub_dirs = pending_scans.pop().result()
+                music_files.extend(files)
+                # Start listing every sub-directory now; they are collected in listing order
+                pending_scans.extend(reversed([executor.submit(self._scan_directory, sub_dir, with_stats) for sub_dir in sub_dirs]))
+        return music_files
 
     def find_music_files(self, root_dir: str) -> List[str]:
         """
@@ -399,37 +672,113 @@ class MusicTagger:
             root_dir (str): The root directory to search in.
 
         Returns:
-            List[str]: A list of file paths for supported music files.
+            List[str]: A list of file paths for supported music files, in os.walk order.
         """
-        music_files: list[str] = []
-        extensions = list(self.SUPPORTED_FORMATS.keys())
+        return self._walk_music_files(root_dir, with_stats=False)
 
-        for root, _, files in os.walk(root_dir):
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in extensions):
-                    file_path = os.path.join(root, file)
-                    music_files.append(file_path)
-        return music_files
+    def scan_music_files(self, root_dir: str) -> List['MusicFile']:
+        """
+        Like find_music_files, but also returns each file's extension and stat result. The stats are
+        taken on the scan threads, so callers checking mtimes (the AI results cache) don't stat
+        every file again one by one.
 
+        Args:
+            root_dir (str): The root directory to search in.
 
-    def process_directory(self, root_dir: str, auto_apply_tags: bool, musicnn_settings: 'musicnn_tagger.config.MusicnnSettings', lastfm_settings: 'lastfm_tagger.config.Settings') -> None:
-        """
-        Recursively finds music files and returns paths.  The actual processing
-        is now handled by the main process and worker processes.
+        Returns:
+            List[MusicFile]: The supported music files, in os.walk order.
         """
-        music_files = self.find_music_files(root_dir)
-        print(f"🔎 Found {len(music_files)} supported music files")  # No colors here
+        return self._walk_music_files(root_dir, with_stats=True)
 
 
-    def get_music_files_count(self, root_dir: str):
-        music_files = self.find_music_files(root_dir)
-        print(f"🔎 Found {C_PROMPT}{len(music_files)}{C_RESET}{C_BOLD} supported{C_RESET} music files")
+    def process_directory(self, root_dir: str, auto_apply_tags: bool, musicnn_settings: 'musicnn_tagger.config.MusicnnSettings', lastfm_settings: 'lastfm_tagger.config.Settings', precompute: bool = True,
+                          ai_results_cache: Optional[AIResultsCache] = None, skip_tagged_files: bool = False) -> None:
+        """
+        Processes every music file under root_dir in the current process, without the worker pool
+        the interactive menu uses (standalone runs of this module).
+
+        Args:
+            root_dir (str): The music root directory.
+            auto_apply_tags (bool): If True, automatically apply suggested tags.
+            musicnn_settings (MusicnnSettings): Settings for Musicnn tagger.
+            lastfm_settings (LastFMSettings): Settings for LastFM tagger.
+            precompute (bool): Analyze upcoming files in a background thread while the user answers
+                prompts. False analyzes each file right before its prompt, keeping one file in memory.
+            ai_results_cache (Optional[AIResultsCache]): Persistent AI results of earlier runs; unchanged
+                files found in it are not analyzed again. None analyzes every file.
+            skip_tagged_files (bool): Leave out files that already have a genre tag.
+        """
+        scanned_files = self.scan_music_files(root_dir)
+        print(f"🔎 Found {len(scanned_files)} supported music files")  # No colors here
+        if skip_tagged_files:
+            scanned_files = [music_file for music_file in scanned_files if not self.has_genre_tag(music_file.path, music_file.ext)]
+            print(f"{len(scanned_files)} of them have no genre tag yet")
+        music_files = [music_file.path for music_file in scanned_files]
+
+        # Cache lookups and updates stay on this thread; only the analysis runs in the background
+        cached_results: Dict[str, Dict[str, float]] = {}
+        if ai_results_cache is not None:
+            ai_settings_key = AIResultsCache.settings_key(musicnn_settings)
+            for music_file in scanned_files:
+                cached_genres = ai_results_cache.get(music_file.path, ai_settings_key, music_file.stat)
+                if cached_genres is not None:
+                    cached_results[music_file.path] = cached_genres
+            if cached_results:
+                print(f"Reusing cached AI results for {len(cached_results)} unchanged files")
+
+        def tag_file(file_path: str, ai_genres: Optional[Dict[str, float]]) -> None:
+            """Prompts for and tags one file; ai_genres is None when it came from the cache."""
+            if ai_genres is None:
+                ai_genres = cached_results.pop(file_path)
+            elif ai_results_cache is not None:
+                ai_results_cache.put(file_path, ai_settings_key, ai_genres)
+            self.ai_genre_suggestions_cache[file_path] = ai_genres
+            processed = self.process_music_file(file_path, auto_apply_tags, musicnn_settings, lastfm_settings)
+            if processed and ai_results_cache is not None:
+                ai_results_cache.refresh(file_path)  # Writing the genre tag changed mtime and size
+
+        # Files with cached results need no analysis, so they are prompted for first
+        music_files.sort(key=lambda file_path: file_path not in cached_results)
+        self.prefetch_lastfm_tags(music_files, lastfm_settings)
+        try:
+            if not precompute:
+                for file_path in music_files:
+                    tag_file(file_path, None if file_path in cached_results else analyze_music_file(file_path, musicnn_settings))
+                return
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                futures = {
+                    file_path: executor.submit(analyze_music_file, file_path, musicnn_settings)
+                    for file_path in music_files if file_path not in cached_results
+                }
+                try:
+                    for file_path in music_files:
+                        future = futures.get(file_path)
+                        tag_file(file_path, future.result() if future is not None else None)
+                finally:
+                    for future in futures.values():
+                        future.cancel()  # Don't keep analyzing files nobody will be prompted for
+        finally:
+            self.cancel_lastfm_prefetch()
+            if ai_results_cache is not None:
+                ai_results_cache.save()  # Keep what was analyzed, even if the run was interrupted
+
+
+    def get_music_files_count(self, root_dir: str) -> int:
+        """Returns the number of supported music files found recursively under root_dir."""
+        return len(self.find_music_files(root_dir))
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python music_tagger.py <music_directory>")
     music_tagger = MusicTagger()
-    music_dir = r"music_root_folder_path"  # Replace with your music directory
+    music_dir = sys.argv[1]
     # Example settings - in real usage, these should come from your settings management
-    from main import MusicnnSettings, LastFMSettings  # Import from main temporarily for standalone test - in real app, these will be passed from main
+    from main import MusicnnSettings, LastFMSettings, get_app_settings  # Import from main temporarily for standalone test - in real app, these will be passed from main
     musicnn_settings = MusicnnSettings()
     lastfm_settings = LastFMSettings()
-    music_tagger.process_directory(music_dir, False, musicnn_settings, lastfm_settings)
\ No newline at end of file
+    app_settings = get_app_settings()
+    ai_results_cache = AIResultsCache() if app_settings.ai_cache_enabled else None
+    music_tagger.process_directory(music_dir, False, musicnn_settings, lastfm_settings, ai_results_cache=ai_results_cache,
+                                   skip_tagged_files=app_settings.skip_tagged_files)
\ No newline at end of file
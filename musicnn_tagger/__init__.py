@@ -1,3 +1,26 @@
 #!filepath: musicnn_tagger/__init__.py
-from .tagger import get_musicnn_tags
-from .taggram import init_extractor, show_taggram, show_tags_likelihood_mean
\ No newline at end of file
+import _bootstrap  # Sets TensorFlow environment variables before musicnn imports TF
+import importlib
+
+# Public names and the submodule defining each. They are imported on first access (PEP 562),
+# so importing musicnn_tagger.config, e.g. for the settings, does not load TensorFlow.
+_LAZY_ATTRIBUTES = {
+    'compute_audio_rep': '.taggram',
+    'get_musicnn_tags': '.tagger',
+    'init_extractor': '.taggram',
+    'load_model': '.taggram',
+    'set_session_threads': '.taggram',
+    'show_taggram': '.taggram',
+    'show_tags_likelihood_mean': '.taggram',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
@@ -1,79 +1,109 @@
 # path musicnn_tagger/config.py
-from dataclasses import dataclass, field
+import functools
 import os
-from dotenv import load_dotenv, set_key
+from dotenv import load_dotenv
 import pathlib
 import logging
+from types import MappingProxyType
 from typing import Dict
-import json  # Import json for serialization
+import orjson  # For MUSICNN_ENABLED_MODELS values saved as JSON by earlier versions
+
+from env_file import save_env_values
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Load environment variables from .env file in the parent directory once, at import time
+_DOTENV_PATH = pathlib.Path(__file__).parent.parent / '.env'
+load_dotenv(dotenv_path=_DOTENV_PATH, encoding='utf-8', verbose=False)
+
+# Models and whether they are enabled by default; read-only, default_enabled_models() returns copies
+_DEFAULT_ENABLED_MODELS = MappingProxyType({
+    'MSD_musicnn_big': True,
+    'MTT_musicnn': True,
+    'MTT_vgg': True,
+    'MSD_musicnn': True,
+    'MSD_vgg': True
+})
+
 class MusicnnSettings:
     """
     Settings for the Musicnn AI tagger, loaded from and saved to .env file,
     including persistence for the enabled_models dictionary.
     """
-    enabled: bool = True
-    threshold_weight: float = 0.2
-    genres_count: int = 5
-    enabled_models: Dict[str, bool] = field(default_factory=lambda: {
-        'MSD_musicnn_big': True,
-        'MTT_musicnn': True,
-        'MTT_vgg': True,
-        'MSD_musicnn': True,
-        'MSD_vgg': True
-    })
+    __slots__ = ('dotenv_path', 'enabled', 'threshold_weight', 'genres_count', 'enabled_models')
 
-    def __post_init__(self):
+    enabled: bool
+    threshold_weight: float
+    genres_count: int
+    enabled_models: Dict[str, bool]
+
+    def __init__(self):
         """
         Initialize MusicnnSettings by loading values from .env file,
         including enabled_models.
         """
-        self.dotenv_path = pathlib.Path(__file__).parent.parent / '.env'
-        load_dotenv(dotenv_path=self.dotenv_path, encoding='utf-8', verbose=False) # Load .env
+        self.dotenv_path = _DOTENV_PATH  # .env is already loaded at import time
 
-        self.enabled = os.getenv("MUSICNN_ENABLED", 'True').lower() == 'true'
-        self.threshold_weight = float(os.getenv("MUSICNN_THRESHOLD_WEIGHT", 0.2))
-        self.genres_count = int(os.getenv("MUSICNN_GENRES_COUNT", 5))
+        env = os.environ
+        self.enabled = env.get("MUSICNN_ENABLED", 'True').lower() == 'true'
+        self.threshold_weight = float(env.get("MUSICNN_THRESHOLD_WEIGHT", 0.2))
+        self.genres_count = int(env.get("MUSICNN_GENRES_COUNT", 5))
 
-        # Load enabled_models from .env as a JSON string and parse it
-        enabled_models_str = os.getenv("MUSICNN_ENABLED_MODELS")
+        # Load enabled_models from .env ("MSD_musicnn_big=1,MTT_musicnn=0,...") and parse it
+        enabled_models_str = env.get("MUSICNN_ENABLED_MODELS")
         if enabled_models_str:
             try:
-                self.enabled_models = json.loads(enabled_models_str)
-                if not isinstance(self.enabled_models, dict): # Basic validation after loading
+                self.enabled_models = self._parse_enabled_models(enabled_models_str)
+                if not self.enabled_models: # Basic validation after loading
                     logger.warning("Invalid format for MUSICNN_ENABLED_MODELS in .env, using default models.")
                     self.enabled_models = self.default_enabled_models() # Fallback to default if loading fails
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 logger.warning("Could not decode MUSICNN_ENABLED_MODELS from .env, using default models.")
                 self.enabled_models = self.default_enabled_models() # Fallback to default on decode error
         else:
             self.enabled_models = self.default_enabled_models() # Use default if not in .env
 
+    @staticmethod
+    def _parse_enabled_models(enabled_models_str: str) -> Dict[str, bool]:
+        """
+        Parses MUSICNN_ENABLED_MODELS, a comma-separated list of name=1/0 pairs. Values saved as a JSON
+        object by earlier versions are still read. Unknown model names are dropped and missing ones get
+        their default, so every known model can be toggled in the menu. Returns {} if no known model is named.
+        """
+        if enabled_models_str.lstrip().startswith('{'):  # Legacy JSON format
+            parsed = orjson.loads(enabled_models_str)
+            if not isinstance(parsed, dict):
+                return {}
+        else:
+            parsed = {name.strip(): flag.strip() == '1'
+                      for name, _, flag in (pair.partition('=') for pair in enabled_models_str.split(','))}
+        known_names = _DEFAULT_ENABLED_MODELS.keys() & parsed.keys()
+        if not known_names:
+            return {}
+        return {name: bool(parsed[name]) if name in known_names else is_enabled
+                for name, is_enabled in _DEFAULT_ENABLED_MODELS.items()}
 
     def save_settings(self):
         """
         Save current Musicnn settings to .env file, including enabled_models.
         """
-        set_key(self.dotenv_path, "MUSICNN_ENABLED", str(self.enabled).upper())
-        set_key(self.dotenv_path, "MUSICNN_THRESHOLD_WEIGHT", str(self.threshold_weight))
-        set_key(self.dotenv_path, "MUSICNN_GENRES_COUNT", str(self.genres_count))
-
-        # Serialize enabled_models dictionary to JSON string and save it
-        enabled_models_str = json.dumps(self.enabled_models)
-        set_key(self.dotenv_path, "MUSICNN_ENABLED_MODELS", enabled_models_str)
+        save_env_values(self.dotenv_path, {
+            "MUSICNN_ENABLED": str(self.enabled).upper(),
+            "MUSICNN_THRESHOLD_WEIGHT": str(self.threshold_weight),
+            "MUSICNN_GENRES_COUNT": str(self.genres_count),
+            # Serialize enabled_models dictionary as name=1/0 pairs and save it
+            "MUSICNN_ENABLED_MODELS": ",".join(f"{name}={int(is_enabled)}" for name, is_enabled in self.enabled_models.items()),
+        })
 
         logger.debug("MusicnnSettings saved to .env (including enabled_models).")
 
     @staticmethod
     def default_enabled_models() -> Dict[str, bool]:
-        """Returns the default enabled_models dictionary."""
-        return {
-            'MSD_musicnn_big': True,
-            'MTT_musicnn': True,
-            'MTT_vgg': True,
-            'MSD_musicnn': True,
-            'MSD_vgg': True
-        }
\ No newline at end of file
+        """Returns a new copy of the default enabled_models dictionary."""
+        return dict(_DEFAULT_ENABLED_MODELS)
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> MusicnnSettings:
+    """Returns a process-wide MusicnnSettings instance, built on first use."""
+    return MusicnnSettings()
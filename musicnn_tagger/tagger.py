@@ -1,28 +1,32 @@
 #!filepath: musicnn_tagger/tagger.py
-from .taggram import init_extractor, get_sorted_tag_weights
-from typing import Dict, List, Tuple
+# .taggram (TensorFlow, librosa) is imported where it is used, so get_top_n_genres and
+# combine_genre_dicts can be imported without loading TensorFlow
+from typing import Dict, List, Sequence, Tuple
 import concurrent.futures
+import heapq
+from operator import itemgetter
 import os
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Gender keywords matched as whole words; longer tags ('female vocals', 'male singer', ...) contain one of them
+_FEMALE_TAG_RE = re.compile(r'\b(?:female|woman)\b', re.IGNORECASE)
+_MALE_TAG_RE = re.compile(r'\b(?:male|man)\b', re.IGNORECASE)
+# Models used when get_musicnn_tags is called without enabled_models_config
+_DEFAULT_MODEL_NAMES = ('MSD_musicnn_big', 'MTT_musicnn')
+
 
 def get_top_n_genres(data: Dict[str, float], top_n: int = 5, min_weight: float = 0.0) -> Dict[str, float]:
     """
     Sorts a dictionary by value in descending order and returns the top N items
     that have a value greater than or equal to min_weight.
     """
-    sorted_genres = {}
-    for key, value in sorted(data.items(), key=lambda x: x[1], reverse=True):
-        if value >= min_weight:
-            if top_n <= 0:
-                break
-            sorted_genres[key] = value
-            top_n -= 1
-        else:
-            break
-    return sorted_genres
+    candidates = [(key, value) for key, value in data.items() if value >= min_weight]
+    # nlargest keeps only top_n items on a heap instead of sorting them all; given a list, it uses a
+    # plain sort when top_n covers every candidate, and max() when top_n is 1. Ties keep their order
+    return dict(heapq.nlargest(top_n, candidates, key=itemgetter(1)))
 
 
 def combine_genre_dicts(*genre_dicts: Dict[str, float]) -> Dict[str, float]:
@@ -30,23 +34,25 @@ def combine_genre_dicts(*genre_dicts: Dict[str, float]) -> Dict[str, float]:
     Combine multiple dictionaries, retaining the highest value for common keys.
     """
     combined_genres: Dict[str, float] = {}
+    combined_get = combined_genres.get  # Bound once for the inner loop
     for genre_dict in genre_dicts:
-        combined_genres.update(
-            (key, max(combined_genres.get(key, 0), value)) for key, value in genre_dict.items()
-        )
+        for key, value in genre_dict.items():
+            if value > combined_get(key, -1.0):  # Weights are never negative, so new keys always go in
+                combined_genres[key] = value
     return combined_genres
 
-def _process_model(music_path: str, model_name: str, genres_count: int, min_weight: float) -> Dict[str, float]:
-    """Helper function to process a single model."""
+def _process_model(music_path: str, model_name: str, genres_count: int, min_weight: float, audio_rep=None) -> Dict[str, float]:
+    """Helper function to process a single model. audio_rep is the file's spectrogram, shared by all models."""
+    from .taggram import init_extractor, get_top_tag_weights
     try:
-        taggram, model_tags = init_extractor(music_path, model=model_name)
+        taggram, model_tags = init_extractor(music_path, model=model_name, audio_rep=audio_rep)
     except Exception as e:
         logger.warning(f"Error loading model {model_name}: {e}")
         if model_name == 'MSD_musicnn_big': # Fallback logic for MSD_musicnn_big
             fallback_model = 'MTT_musicnn'
             logger.warning(f"Falling back from {model_name} to {fallback_model}...")
             try:
-                taggram, model_tags = init_extractor(music_path, model=fallback_model) # Try fallback model
+                taggram, model_tags = init_extractor(music_path, model=fallback_model, audio_rep=audio_rep) # Try fallback model
                 logger.info(f"Successfully loaded fallback model {fallback_model}.")
             except Exception as fallback_e:
                 logger.error(f"Error loading fallback model {fallback_model}: {fallback_e}. Returning empty tags.")
@@ -55,84 +61,86 @@ def _process_model(music_path: str, model_name: str, genres_count: int, min_weig
             logger.warning(f"Falling back to empty tags for {model_name} due to loading error.")
             return {} # Return empty dict if model fails to load
 
-    sorted_weights = get_sorted_tag_weights(taggram, model_tags)
-    return get_top_n_genres(sorted_weights, genres_count, min_weight)
+    return get_top_tag_weights(taggram, model_tags, genres_count, min_weight)
 
 def _remove_duplicate_gender_tags(genre_dict: Dict[str, float]) -> Dict[str, float]:
     """
     Removes duplicate gender-specific tags, keeping only the shortest tag.
+    genre_dict is modified in place (get_musicnn_tags passes a freshly combined dict).
 
     Args:
         genre_dict (Dict[str, float]): Dictionary of genres and their weights.
 
     Returns:
-        Dict[str, float]: Modified dictionary with duplicate gender tags removed.
+        Dict[str, float]: genre_dict, with duplicate gender tags removed.
     """
-    modified_genre_dict = genre_dict.copy()
-    female_keywords = ['woman', 'female', 'female vocal', 'female voice', 'female vocalists', 'female singer', 'female vocals']
-    male_keywords = ['man', 'male', 'male vocal', 'male voice', 'male vocalists', 'male singer', 'male vocals']
-
     female_tags = []
     male_tags = []
+    shortest_female_tag = shortest_male_tag = None
 
-    # Identify all gender-related tags
+    # Identify all gender-related tags, tracking the shortest of each (the first one on ties)
     for tag in genre_dict:
-        tag_lower = tag.lower()
-        for keyword in female_keywords:
-            if keyword in tag_lower:
-                female_tags.append(tag)
-                break  # Avoid double-counting
-        for keyword in male_keywords:
-            if keyword in tag_lower:
-                male_tags.append(tag)
-                break
-
-    # Remove duplicates for female tags, keeping the shortest
-    if female_tags:
-        shortest_female_tag = min(female_tags, key=len) # Find the shortest tag
-        for tag in female_tags:
-            if tag != shortest_female_tag:
-                if tag in modified_genre_dict: # Check for exist
-                    del modified_genre_dict[tag]
-
-    # Remove duplicates for male tags, keeping the shortest
-    if male_tags:
-        shortest_male_tag = min(male_tags, key=len)
-        for tag in male_tags:
-            if tag != shortest_male_tag:
-                if tag in modified_genre_dict: # Check for exist
-                    del modified_genre_dict[tag]
-
-    return modified_genre_dict
-
-def get_musicnn_tags(music_path: str = '', ai_genres_count: int = 5, max_genres_return_count: int = 5, min_weight: float = 0.2, enabled_models_config: Dict[str, bool] = None) -> Dict[str, float]:
+        if _FEMALE_TAG_RE.search(tag):
+            female_tags.append(tag)
+            if shortest_female_tag is None or len(tag) < len(shortest_female_tag):
+                shortest_female_tag = tag
+        elif _MALE_TAG_RE.search(tag):
+            male_tags.append(tag)
+            if shortest_male_tag is None or len(tag) < len(shortest_male_tag):
+                shortest_male_tag = tag
+
+    # Remove the other tags of each gender; the lists hold a handful of tags at most
+    for tag in female_tags:
+        if tag != shortest_female_tag:
+            del genre_dict[tag]
+    for tag in male_tags:
+        if tag != shortest_male_tag:
+            del genre_dict[tag]
+
+    return genre_dict
+
+def get_musicnn_tags(music_path: str = '', ai_genres_count: int = 5, max_genres_return_count: int = 5, min_weight: float = 0.2, enabled_models_config: Dict[str, bool] = None,
+                     audio_rep=None) -> Dict[str, float]:
     """
     Initializes and uses multiple AI models to extract and process music tags.
     Removes duplicate gender tags.
     Uses enabled_models_config to determine which models to use.
+    audio_rep is the file's spectrogram from compute_audio_rep, if the caller already has it.
     """
-    logger.debug(f'Processing AI genres for: {music_path.split(os.sep)[-1]}')
+    if logger.isEnabledFor(logging.DEBUG):  # Skip building the message when debug logging is off
+        logger.debug(f'Processing AI genres for: {os.path.basename(music_path)}')
 
     # Use enabled_models_config to get the list of enabled models
     if enabled_models_config is None:
-        model_names: List[str] = ['MSD_musicnn_big', 'MTT_musicnn'] # Default models if config is not provided (should not happen in normal use)
+        model_names: Sequence[str] = _DEFAULT_MODEL_NAMES # Default models if config is not provided (should not happen in normal use)
     else:
-        model_names: List[str] = [model_name for model_name, is_enabled in enabled_models_config.items() if is_enabled]
+        model_names = [model_name for model_name, is_enabled in enabled_models_config.items() if is_enabled]
 
-    tags_list: List[Dict[str, float]] = []
     num_enabled_models = len(model_names)
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_enabled_models if num_enabled_models > 0 else 1) as executor: # Use number of enabled models as max_workers
-        futures = [executor.submit(_process_model, music_path, model_name, ai_genres_count, min_weight) for model_name in model_names]
-        for future in concurrent.futures.as_completed(futures):
-            tags_list.append(future.result())
+    if not num_enabled_models:
+        return {}
+
+    if audio_rep is None:
+        from .taggram import compute_audio_rep
+        # Decode the file and compute its spectrogram once; every model takes patches of the same one
+        try:
+            audio_rep = compute_audio_rep(music_path)
+        except Exception as e:
+            logger.error(f"Error reading audio of {music_path}: {e}")
+            return {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_enabled_models) as executor: # Use number of enabled models as max_workers
+        # Results in model order, so ties between models always combine the same way
+        tags_list: List[Dict[str, float]] = list(executor.map(
+            lambda model_name: _process_model(music_path, model_name, ai_genres_count, min_weight, audio_rep), model_names))
 
     combined_tags: Dict[str, float] = combine_genre_dicts(*tags_list)
 
     # Remove duplicate gender tags
     deduplicated_tags = _remove_duplicate_gender_tags(combined_tags)
 
-    logger.debug(f'AI genre processing complete for: {music_path.split(os.sep)[-1]}')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f'AI genre processing complete for: {os.path.basename(music_path)}')
     return get_top_n_genres(deduplicated_tags, max_genres_return_count, min_weight)
 
 
@@ -1,26 +1,135 @@
 #!filepath: musicnn_tagger/taggram.py
-from musicnn.extractor import extractor
+# musicnn.extractor disables TF eager execution on import, which the musicnn models need
+import musicnn.extractor  # noqa: F401
+from musicnn import configuration as config
+from musicnn import models
+from typing import Dict, List
+import librosa
 import numpy as np
-import matplotlib.pyplot as plt
+import tensorflow as tf
 import logging
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
 
-def init_extractor(music_path = '', model='MSD_musicnn_big'):
+class LoadedModel:
+    """A musicnn model restored into its own graph and session, kept for the life of the process."""
+    __slots__ = ('labels', 'n_frames', 'session', 'input', 'is_training', 'output')
+
+    def __init__(self, labels: List[str], n_frames: int, session: 'tf.compat.v1.Session', input, is_training, output):
+        self.labels = labels
+        self.n_frames = n_frames
+        self.session = session
+        self.input = input
+        self.is_training = is_training
+        self.output = output
+
+
+# Per process: model name -> restored model, or the error it failed to load with (not retried)
+_loaded_models: Dict[str, LoadedModel] = {}
+_load_errors: Dict[str, Exception] = {}
+_load_lock = threading.Lock()
+# TensorFlow intra-/inter-op pool size for the sessions of this process; 0 lets TensorFlow use every core
+_session_threads = 0
+
+
+def set_session_threads(threads: int) -> None:
     """
-    Initializes the musicnn extractor for a given music path and model.
-    Renamed from init_extractor to init_extractor for clarity and consistency.
+    Sets the size of TensorFlow's thread pools in this process. Call before the first model is
+    loaded: the pools are process-wide and created with the first session.
+    """
+    global _session_threads
+    _session_threads = threads
+
+
+def _restore_model(model: str) -> LoadedModel:
+    """
+    Builds the model graph and restores its weights, as musicnn.extractor.extractor does on
+    every call, but in a graph of its own so the session can be reused.
+    """
+    labels = config.MTT_LABELS if 'MTT' in model else config.MSD_LABELS
+    input_length = 3 if 'vgg' in model else 30  # Seconds per patch; the vgg models only take 3
+    n_frames = librosa.time_to_frames(input_length, sr=config.SR, n_fft=config.FFT_SIZE, hop_length=config.FFT_HOP) + 1
+
+    graph = tf.Graph()
+    with graph.as_default():
+        with tf.name_scope('model'):
+            x = tf.compat.v1.placeholder(tf.float32, [None, n_frames, config.N_MELS])
+            is_training = tf.compat.v1.placeholder(tf.bool)
+            y = models.define_model(x, is_training, model, len(labels))[0]
+            normalized_y = tf.nn.sigmoid(y)
+        session = tf.compat.v1.Session(graph=graph, config=tf.compat.v1.ConfigProto(
+            intra_op_parallelism_threads=_session_threads, inter_op_parallelism_threads=_session_threads))
+        session.run(tf.compat.v1.global_variables_initializer())
+        try:
+            # Same location musicnn loads from: the model folder inside the musicnn package
+            tf.compat.v1.train.Saver().restore(session, os.path.join(os.path.dirname(models.__file__), model) + '/')
+        except Exception as e:
+            session.close()
+            raise ValueError(f"Could not load weights of model {model}: {e}") from e
+    return LoadedModel(labels, n_frames, session, x, is_training, normalized_y)
+
+
+def load_model(model: str) -> LoadedModel:
+    """
+    Returns the model, restoring it on first use in this process. Restoring takes seconds while
+    tagging one file takes a fraction of that, so models are loaded once and then reused.
+
+    Raises:
+        ValueError: If the model could not be loaded (e.g. MSD_musicnn_big is not installed).
+    """
+    loaded = _loaded_models.get(model)
+    if loaded is not None:
+        return loaded
+    with _load_lock:
+        if model in _load_errors:
+            raise _load_errors[model]
+        loaded = _loaded_models.get(model)
+        if loaded is None:
+            try:
+                loaded = _restore_model(model)
+            except Exception as e:
+                _load_errors[model] = e
+                raise
+            _loaded_models[model] = loaded
+    return loaded
+
+
+def compute_audio_rep(music_path: str) -> np.ndarray:
+    """
+    Decodes a music file and returns its log-mel spectrogram (time, frequency), as
+    musicnn.extractor.batch_data does. It is the same for every model, so it can be computed
+    once per file and passed to init_extractor for each model.
     """
-    # music_path = r"D:\GITHB\yt not found\Supersonic   FINIVOID.mp3"
-    if 'vgg' in model:
-        input_length = 3
-    else:
-        input_length = 30
+    audio, sr = librosa.load(music_path, sr=config.SR)
+    audio_rep = librosa.feature.melspectrogram(y=audio, sr=sr, hop_length=config.FFT_HOP,
+                                               n_fft=config.FFT_SIZE, n_mels=config.N_MELS).T
+    audio_rep = audio_rep.astype(np.float16)
+    return np.log10(10000 * audio_rep + 1)
 
+
+def init_extractor(music_path = '', model='MSD_musicnn_big', audio_rep: np.ndarray = None):
+    """
+    Computes the taggram of a music file with the given model (see musicnn.extractor.extractor).
+    Renamed from init_extractor to init_extractor for clarity and consistency.
+    audio_rep is the file's spectrogram from compute_audio_rep, if the caller already has it.
+    """
     try: # Problem 4: Handle MSD_musicnn_big availability, use try-except to catch potential model loading issues
-        taggram, tags = extractor(music_path, model, extract_features=False, input_length=input_length)
-        return taggram, tags
+        loaded = load_model(model)
+        if audio_rep is None:
+            audio_rep = compute_audio_rep(music_path)
+        # Patches of n_frames without overlap, as batch_data makes them; a partial last patch is dropped
+        n_patches = audio_rep.shape[0] // loaded.n_frames
+        if not n_patches:
+            raise ValueError(f"{music_path} is shorter than the {model} input")
+        batch = audio_rep[:n_patches * loaded.n_frames].reshape(n_patches, loaded.n_frames, audio_rep.shape[1])
+        taggram = np.concatenate([
+            loaded.session.run(loaded.output, feed_dict={loaded.input: batch[start:start + config.BATCH_SIZE], loaded.is_training: False})
+            for start in range(0, batch.shape[0], config.BATCH_SIZE)
+        ], axis=0)
+        return taggram, loaded.labels
     except Exception as e:
         logger.error(f"Error initializing extractor with model {model}: {e}")
         raise # Re-raise exception to be handled in tagger.py
@@ -30,6 +139,7 @@ def show_taggram(taggram, tags):
     """
     Displays the taggram visualization.
     """
+    import matplotlib.pyplot as plt  # Deferred: only needed for the visualizations
     plt.rcParams["figure.figsize"] = (10,8) # set size of the figures
     fig, ax = plt.subplots()
     fontsize = 8 # set figures font size
@@ -61,6 +171,7 @@ def show_tags_likelihood_mean(taggram, tags):
     """
     Displays the tags likelihood mean visualization.
     """
+    import matplotlib.pyplot as plt  # Deferred: only needed for the visualizations
     plt.rcParams["figure.figsize"] = (10,8) # set size of the figures
     tags_likelihood_mean = np.mean(taggram, axis=0) # averaging the Taggram through time
     fig, ax = plt.subplots()
@@ -94,9 +205,22 @@ def get_sorted_tag_weights(taggram, tags):
     Renamed from get_sorted_tag_weights to get_sorted_tag_weights for clarity and consistency.
     """
     tags_likelihood_mean = np.mean(taggram, axis=0)
-    tag_weight_dict = dict(zip(tags, tags_likelihood_mean))
-    sorted_tags = dict(sorted(tag_weight_dict.items(), key=lambda x: x[1], reverse=True))
-    return sorted_tags
+    order = np.argsort(-tags_likelihood_mean, kind='stable')  # Stable, like sorted(): ties keep tag order
+    return {tags[i]: float(tags_likelihood_mean[i]) for i in order}
+
+
+def get_top_tag_weights(taggram, tags, top_n: int, min_weight: float = 0.0) -> Dict[str, float]:
+    """
+    Returns up to top_n tags whose mean weight over the taggram is at least min_weight, highest first.
+    Same result as get_top_n_genres(get_sorted_tag_weights(taggram, tags), top_n, min_weight), ties
+    included, but ranked in NumPy without building and sorting a dict of every tag.
+    """
+    if top_n <= 0:
+        return {}
+    tags_likelihood_mean = np.mean(taggram, axis=0)
+    top_indices = np.argsort(-tags_likelihood_mean, kind='stable')[:top_n]  # Stable, like sorted(): ties keep tag order
+    # Weights are in descending order, so the ones at or above min_weight come first
+    return {tags[i]: float(tags_likelihood_mean[i]) for i in top_indices if tags_likelihood_mean[i] >= min_weight}
 
 if __name__ == '__main__':
     music_path = r"music_root_folder_path"